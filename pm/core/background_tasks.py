@@ -218,7 +218,7 @@ class Worker(QObject):
 
                 text = path.read_text(encoding='utf-8', errors='ignore')
                 if not text.strip(): # Skip empty files
-                    logger.trace(f"Skipping empty file in tree context: {path.name}")
+                    logger.trace("Skipping empty file in tree context: {}", path.name)
                     continue
 
                 # Determine relative path for markers
@@ -392,7 +392,7 @@ class Worker(QObject):
                         parts.append(f'{header}\n{snippet}\n{footer}')
                         available_tokens -= total
                         tokens_used += total
-                        logger.trace(f"Worker: Added Ext RAG '{title[:30]}' ({total} tokens). Rem: {available_tokens}")
+                        logger.trace("Worker: Added Ext RAG '{:.30}' ({} tokens). Rem: {}", str(title), total, available_tokens)
                     else:
                         # Try truncating
                         needed=max(0, available_tokens - h_tok - f_tok - 10) # Safety margin
@@ -456,7 +456,7 @@ class Worker(QObject):
 
                             text = path.read_text(encoding='utf-8', errors='ignore')
                             if not text.strip():
-                                logger.trace(f"Worker: Skipping empty Local RAG file: {path.name}")
+                                logger.trace("Worker: Skipping empty Local RAG file: {}", path.name)
                                 continue
 
                             # Use path_str from config for markers for clarity
@@ -471,7 +471,7 @@ class Worker(QObject):
                                 available_tokens -= total
                                 tokens_used += total
                                 sources_processed += 1
-                                logger.trace(f"Worker: Added Local RAG file '{path.name}' ({total} tokens). Rem: {available_tokens}")
+                                logger.trace("Worker: Added Local RAG file '{}' ({} tokens). Rem: {}", path.name, total, available_tokens)
                             else:
                                 # Try truncating
                                 needed = max(0, available_tokens - h_tok - f_tok - 10)
@@ -0,0 +1,163 @@
+# pm/core/change_detection.py
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Tuple, Optional, Iterator
+from PySide6.QtCore import QObject, Signal, Slot, QThread
+from loguru import logger
+
+# Helper to normalize line endings
+# LF-only content (the common case) costs one memchr scan and is returned as-is
+def normalize_newlines(text: str) -> str:
+    if text is None:
+        return ""
+    if '\r' not in text:
+        return text
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+def normalize_newlines_bytes(data: bytes) -> bytes:
+    if data is None:
+        return b""
+    if b'\r' not in data:
+        return data
+    return data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+MAX_COMPARE_WORKERS = 8
+STREAM_COMPARE_THRESHOLD = 64 * 1024 # Larger files are compared in chunks instead of read whole
+STREAM_CHUNK_SIZE = 256 * 1024
+START_FILE_MARKER = '### START FILE: '
+_CHANGE_BLOCK_PATTERN = re.compile(
+    r"### START FILE: (?P<filepath>.*?) ###\n(?P<content>.*?)\n### END FILE: (?P=filepath) ###",
+    re.DOTALL | re.MULTILINE
+)
+
+def iter_change_blocks(text: str) -> Iterator[Tuple[str, str, str]]:
+    """Yields (filepath, content, block_text) for each file block, using plain substring scans.
+
+    Falls back to the regex for the rest of the text when a block is not well-formed.
+    """
+    pos = 0
+    while True:
+        start = text.find(START_FILE_MARKER, pos)
+        if start == -1:
+            return
+        path_start = start + len(START_FILE_MARKER)
+        header_end = text.find(' ###\n', path_start)
+        filepath = text[path_start:header_end] if header_end != -1 else ''
+        end = -1
+        if filepath and '\n' not in filepath:
+            content_start = header_end + 5
+            end_marker = f"\n### END FILE: {filepath} ###"
+            end = text.find(end_marker, content_start)
+        if end == -1:
+            # Malformed or unusual block: let the regex handle the remainder
+            for match in _CHANGE_BLOCK_PATTERN.finditer(text, start):
+                yield match.group('filepath'), match.group('content'), match.group(0)
+            return
+        block_end = end + len(end_marker)
+        yield filepath, text[content_start:end], text[start:block_end]
+        pos = block_end
+
+def is_actual_change(abs_path: Path, proposed_content_raw: str) -> bool:
+    """Returns True if proposed content differs from the file on disk (ignoring line endings)."""
+    if not abs_path.is_file():
+        logger.warning(f"File path '{abs_path}' not found. Treating as change.")
+        return True
+
+    norm_proposed = normalize_newlines(proposed_content_raw).encode('utf-8')
+    # Stat-first: CRLF->LF normalization can at most halve the on-disk size,
+    # so a proposed length outside [ceil(size/2), size] can never match.
+    disk_size = None
+    try:
+        disk_size = abs_path.stat().st_size
+        if not ((disk_size + 1) // 2 <= len(norm_proposed) <= disk_size):
+            logger.debug("Size mismatch for {}: {} on disk, {} proposed.", abs_path.name, disk_size, len(norm_proposed))
+            return True
+    except OSError as e:
+        logger.warning(f"Could not stat {abs_path}: {e}. Falling back to full read.")
+
+    try:
+        if disk_size is None or disk_size <= STREAM_COMPARE_THRESHOLD:
+            # Compare raw bytes (after normalizing line endings) - no UTF-8 decode of the original needed
+            return normalize_newlines_bytes(abs_path.read_bytes()) != norm_proposed
+        return not _stream_equals(abs_path, norm_proposed)
+    except Exception as e:
+        logger.error(f"Failed read original {abs_path}: {e}")
+        logger.warning(f"Treating '{abs_path}' as change due to read error.")
+        return True
+
+def _stream_equals(abs_path: Path, norm_proposed: bytes) -> bool:
+    """Compares a file, newline-normalized chunk by chunk, to proposed bytes without loading it whole."""
+    proposed_view = memoryview(norm_proposed)
+    offset = 0
+    carry = b""
+    with abs_path.open('rb') as f:
+        while True:
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            buf = carry + chunk
+            if chunk and buf.endswith(b'\r'):
+                carry, buf = b'\r', buf[:-1] # A CRLF may straddle the chunk boundary
+            else:
+                carry = b""
+            if buf:
+                norm_chunk = normalize_newlines_bytes(buf)
+                end = offset + len(norm_chunk)
+                if end > len(proposed_view) or proposed_view[offset:end] != norm_chunk:
+                    return False # Early exit on the first differing chunk
+                offset = end
+            if not chunk:
+                return offset == len(proposed_view)
+
+
+class ChangeDetectionWorker(QObject):
+    """Worker object to compare proposed file blocks against disk in a background thread."""
+    results_ready = Signal(str, list) # message_id, list of block texts with actual changes
+    finished = Signal(str) # message_id
+
+    def __init__(self, message_id: str, project_path: Path, blocks: List[Tuple[str, str, str]]):
+        """blocks: list of (relative_path, proposed_content, full_block_text)."""
+        super().__init__()
+        self.message_id = message_id
+        self.project_path = project_path
+        self.blocks = blocks
+        self._thread_ref: Optional[QThread] = None
+
+    def assign_thread(self, thread: QThread):
+        self._thread_ref = thread
+
+    def _compare_block(self, block: Tuple[str, str, str]) -> bool:
+        """Returns True if the block should be queued as a change."""
+        relative_path_str, proposed_content_raw, _ = block
+        if not relative_path_str:
+            logger.warning("Empty file path.")
+            return False
+        try:
+            if is_actual_change(self.project_path / relative_path_str, proposed_content_raw):
+                logger.info(f"Actual change detected for: {relative_path_str}")
+                return True
+            logger.info(f"No actual change detected for: {relative_path_str} (content matches disk).")
+            return False
+        except Exception as e:
+            logger.exception(f"Error processing change block during comparison: {e}")
+            return True
+
+    @Slot()
+    def run(self):
+        """Compare each block against its file on disk."""
+        try:
+            if self._thread_ref and self._thread_ref.isInterruptionRequested():
+                logger.info("ChangeDetectionWorker: Interrupted before comparing blocks.")
+                return
+            if len(self.blocks) == 1:
+                results = [self._compare_block(self.blocks[0])]
+            else:
+                # Reads are I/O bound: overlap them, map() keeps block order
+                with ThreadPoolExecutor(max_workers=min(len(self.blocks), MAX_COMPARE_WORKERS)) as executor:
+                    results = list(executor.map(self._compare_block, self.blocks))
+            if self._thread_ref and self._thread_ref.isInterruptionRequested():
+                logger.info("ChangeDetectionWorker: Interrupted, discarding results.")
+                return
+            changed_blocks = [block[2] for block, changed in zip(self.blocks, results) if changed]
+            self.results_ready.emit(self.message_id, changed_blocks)
+        finally:
+            self.finished.emit(self.message_id)
@@ -7,18 +7,30 @@ from typing import List, Dict, Optional
 
 class ChatManager(QObject):
     """Manages chat history state and logic."""
-    # Signals changes requiring UI update or full re-render
+    # Signals bulk changes requiring a full re-render (e.g., clear)
     history_changed = Signal()
-    # Signals a specific message content update (for dynamic streaming)
+    # Signals a single message added to the end of the history
+    message_appended = Signal(dict) # copy of the message dict
+    # Signals a specific message content update (for dynamic streaming and edits)
     message_content_updated = Signal(str, str) # message_id, full_content
     # Signals when the history is truncated (e.g., after delete/edit)
     history_truncated = Signal()
+    history_truncated_from = Signal(str) # ID of the first removed message
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.chat_history: List[Dict] = []
+        self._id_to_index: Dict[str, int] = {} # message_id -> position in chat_history
         logger.info("ChatManager initialized.")
 
+    def _reindex(self):
+        """Rebuilds the ID index after chat_history is replaced or truncated."""
+        self._id_to_index = {msg['id']: i for i, msg in enumerate(self.chat_history) if msg.get('id')}
+
+    def _append_message(self, msg: Dict):
+        self._id_to_index[msg['id']] = len(self.chat_history)
+        self.chat_history.append(msg)
+
     def add_user_message(self, content: str) -> Optional[str]:
         """Adds a user message to the history."""
         if not content:
@@ -29,9 +41,9 @@ class ChatManager(QObject):
             'content': content,
             'timestamp': datetime.datetime.now()
         }
-        self.chat_history.append(msg)
+        self._append_message(msg)
         logger.debug(f"ChatManager: Added user message {msg['id']}")
-        self.history_changed.emit() # Trigger re-render
+        self.message_appended.emit(dict(msg))
         return msg['id']
 
     def add_ai_placeholder(self) -> Optional[str]:
@@ -42,18 +54,15 @@ class ChatManager(QObject):
             'content': '',
             'timestamp': datetime.datetime.now()
         }
-        self.chat_history.append(msg)
+        self._append_message(msg)
         logger.debug(f"ChatManager: Added AI placeholder {msg['id']}")
-        self.history_changed.emit() # Trigger re-render to show placeholder
+        self.message_appended.emit(dict(msg)) # Show placeholder
         return msg['id']
 
     def _find_message_by_id(self, message_id: str) -> Optional[Dict]:
         """Finds a message dictionary by its ID."""
-        # Iterate backwards as updates usually affect recent messages
-        for msg in reversed(self.chat_history):
-            if msg.get('id') == message_id:
-                return msg
-        return None
+        idx = self._id_to_index.get(message_id, -1)
+        return self.chat_history[idx] if idx != -1 else None
 
     def stream_ai_content_update(self, message_id: str, chunk: str):
         """Appends a chunk to an AI message's content (for streaming)."""
@@ -75,9 +84,9 @@ class ChatManager(QObject):
                   message['content'] = final_content
                   # Emit specific update signal ensures final content is rendered
                   self.message_content_updated.emit(message_id, final_content)
-                  logger.debug(f"ChatManager: Finalized AI message {message_id}")
+                  logger.debug("ChatManager: Finalized AI message {}", message_id)
              else:
-                   logger.trace(f"ChatManager: AI message {message_id} final content already set.") # Use trace
+                   logger.trace("ChatManager: AI message {} final content already set.", message_id) # Use trace
         else:
              if message_id:
                 logger.warning(f"ChatManager: Could not find AI message {message_id} to finalize.")
@@ -85,13 +94,14 @@ class ChatManager(QObject):
 
     def delete_message_and_truncate(self, message_id: str):
         """Finds message by ID, removes it and all subsequent messages."""
-        idx = next((i for i, m in enumerate(self.chat_history) if m.get('id') == message_id), -1)
+        idx = self._id_to_index.get(message_id, -1)
         if idx != -1:
             original_length = len(self.chat_history)
             self.chat_history = self.chat_history[:idx]
+            self._reindex()
             logger.info(f"ChatManager: Deleted message {message_id} & truncated history from {original_length} to {len(self.chat_history)} items.")
             self.history_truncated.emit() # Signal truncation happened
-            self.history_changed.emit() # Signal general change for re-render
+            self.history_truncated_from.emit(message_id)
         else:
              logger.warning(f"ChatManager: Cannot find message {message_id} to delete.")
 
@@ -101,7 +111,7 @@ class ChatManager(QObject):
         if message:
             message['content'] = new_content
             logger.info(f"ChatManager: Updated content for message {message_id}. New content: '{new_content[:50]}...'")
-            # history_changed signal emitted by truncate_history_after or add_ai_placeholder
+            self.message_content_updated.emit(message_id, new_content)
             return True
         else:
             logger.warning(f"ChatManager: Cannot find message {message_id} to update content.")
@@ -109,15 +119,20 @@ class ChatManager(QObject):
 
     def truncate_history_after(self, message_id: str):
         """Truncates history *after* the specified message ID."""
-        idx = next((i for i, m in enumerate(self.chat_history) if m.get('id') == message_id), -1)
+        idx = self._id_to_index.get(message_id, -1)
         if idx != -1:
              original_length = len(self.chat_history)
+             if idx + 1 >= original_length:
+                  logger.debug(f"ChatManager: Nothing after message {message_id} to truncate.")
+                  return
+             first_removed_id = self.chat_history[idx + 1]['id']
              self.chat_history = self.chat_history[:idx + 1] # Keep the message itself
+             self._reindex()
              logger.info(f"ChatManager: Truncated history *after* message {message_id}. Len: {original_length} -> {len(self.chat_history)}.")
              self.history_truncated.emit()
-             # Ensure history_changed is emitted AFTER list modification
-             self.history_changed.emit()
-             logger.debug("ChatManager: Emitted history_truncated and history_changed after truncation.")
+             # Emitted AFTER list modification
+             self.history_truncated_from.emit(first_removed_id)
+             logger.debug("ChatManager: Emitted history_truncated and history_truncated_from after truncation.")
         else:
              logger.warning(f"ChatManager: Cannot find message {message_id} to truncate after.")
 
@@ -130,6 +145,7 @@ class ChatManager(QObject):
     def clear_history(self):
         """Clears the chat history."""
         self.chat_history = []
+        self._id_to_index = {}
         logger.info("ChatManager: History cleared.")
         self.history_changed.emit()
 
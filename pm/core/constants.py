@@ -4,6 +4,12 @@ from PySide6.QtCore import Qt
 # Role for storing token count in QTreeWidgetItems
 TOKEN_COUNT_ROLE = Qt.UserRole + 1
 
+# Role flagging directory items in the file tree (set at population, avoids stat() calls)
+IS_DIR_ROLE = Qt.UserRole + 2
+
+# Role holding the item's pathlib.Path (UserRole keeps the str form for existing readers)
+PATH_ROLE = Qt.UserRole + 3
+
 # Size limit for calculating tokens automatically in file tree (in bytes)
 # Keep this consistent with WorkspaceManager or move that one here too
 TREE_TOKEN_SIZE_LIMIT = 100 * 1024
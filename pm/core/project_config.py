@@ -71,7 +71,11 @@ DEFAULT_CONFIG = {
     'main_window_state': "",    # Store as hex string
     'main_splitter_state': [],  # Store list of hex strings (though likely just one)
     # User Prompts (Used by Executor)
-    'user_prompts': [] # List of strings {id, name, content} - Managed via PromptActionHandler/ConfigDock
+    'user_prompts': [], # List of strings {id, name, content} - Managed via PromptActionHandler/ConfigDock
+    'selected_prompt_ids': [], # Ordered IDs of active user prompts (ConfigDock selection)
+
+    # Debug
+    'debug.show_stub_dialogs': True, # Unimplemented actions pop a modal box (False: status-bar message)
 }
 
 # --- Function to load effective prompts (merging system prompt if template uses it) ---
@@ -132,11 +136,11 @@ def load_project_config(path: Path) -> dict:
         'patch_mode', 'whole_file', 'disable_critic_workflow', # <<< ADDED
         'rag_local_enabled', 'rag_external_enabled', 'rag_google_enabled',
         'rag_bing_enabled', 'rag_stackexchange_enabled', 'rag_github_enabled',
-        'rag_arxiv_enabled', 'rag_summarizer_enabled'
+        'rag_arxiv_enabled', 'rag_summarizer_enabled', 'debug.show_stub_dialogs'
     ]
     float_keys = ['temperature', 'rag_similarity_threshold']
     int_keys = ['top_k', 'context_limit', 'editor_font_size']
-    list_keys = ['rag_local_sources', 'user_prompts'] # Add user_prompts
+    list_keys = ['rag_local_sources', 'user_prompts', 'selected_prompt_ids'] # Add user_prompts
 
     for key in str_keys:
         default_value = DEFAULT_CONFIG.get(key, '')
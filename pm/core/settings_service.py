@@ -24,12 +24,16 @@ class SettingsService(QObject):
     rag_config_changed = Signal() # Emitted for ANY rag change (global default or project enable)
     local_rag_sources_changed = Signal(list) # Specific signal for UI list update
     project_path_changed = Signal(Path)
+    prompts_changed = Signal() # 'user_prompts' list replaced or edited
 
     def __init__(self, parent: Optional[QObject] = None):
         super().__init__(parent)
         # Holds the *effective* settings (Defaults merged with Project .patchmind.json)
         self._settings: Dict[str, Any] = DEFAULT_CONFIG.copy()
         self._project_path: Optional[Path] = None
+        self._prompt_index: Optional[Dict[str, Dict[str, Any]]] = None # id -> prompt, built lazily
+        self._batch_originals: Optional[Dict[str, Any]] = None # key -> value before batch; None = not batching
+        self.prompts_changed.connect(self._invalidate_prompt_index)
         logger.info("SettingsService initialized.")
 
     # --- Core Load/Save ---
@@ -71,6 +75,7 @@ class SettingsService(QObject):
         validated_config, corrections_made = self._validate_config(temp_config)
         self._settings = validated_config # Store the final, validated, merged settings
         self._settings['last_project_path'] = str(self._project_path)
+        self._invalidate_prompt_index()
 
         self.settings_loaded.emit()
         logger.info("SettingsService: Project settings loaded and validated.")
@@ -197,6 +202,11 @@ class SettingsService(QObject):
         # Return from the merged settings, providing a default if necessary
         return self._settings.get(key, default if default is not None else DEFAULT_CONFIG.get(key))
 
+    def get_settings_bulk(self, keys: List[str], defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Returns several settings in one call, falling back to `defaults`, then DEFAULT_CONFIG."""
+        defaults = defaults or {}
+        return {key: self._settings.get(key, defaults.get(key, DEFAULT_CONFIG.get(key))) for key in keys}
+
     def get_all_settings(self) -> Dict[str, Any]:
         return self._settings.copy() # Return copy of the effective settings
 
@@ -238,22 +248,117 @@ class SettingsService(QObject):
         if old_value != value:
             logger.debug(f"SettingsService: Setting '{key}' changed from '{old_value}' to '{value}' (in memory)")
             self._settings[key] = value
+            if self._batch_originals is not None:
+                self._batch_originals.setdefault(key, old_value) # Signals deferred to end_batch()
+                if key == 'user_prompts':
+                    self._invalidate_prompt_index()
+                return
             self.settings_changed.emit(key, value)
             self._emit_specific_signals(key, value)
             # NOTE: This does NOT automatically save to file. Saving happens explicitly
             # via save_settings() (usually called by dialog accept or main window close).
 
-    def _emit_specific_signals(self, key: str, value: Any):
-        """Emits detailed signals based on the changed key."""
-        if key == 'theme': self.theme_changed.emit(value)
-        elif key == 'editor_font': self.font_changed.emit(value, self.get_setting('editor_font_size'))
-        elif key == 'editor_font_size': self.font_changed.emit(self.get_setting('editor_font'), value)
-        elif key == 'syntax_highlighting_style': self.syntax_style_changed.emit(value)
-        elif key in ['provider', 'model', 'api_key', 'temperature', 'top_k', 'context_limit']: self.llm_config_changed.emit()
-        # Emit rag_config_changed for *any* RAG-related setting change
-        elif key.startswith('rag_'): self.rag_config_changed.emit()
-        # Specific signal for local sources list itself
-        if key == 'rag_local_sources': self.local_rag_sources_changed.emit(self.get_local_rag_sources())
+    def _emit_specific_signals(self, key: str, value: Any, already_emitted: Optional[set] = None):
+        """Emits detailed signals based on the changed key.
+
+        With `already_emitted`, each signal fires at most once across calls (batch end);
+        the payloads read current settings, so one emission reflects the final state.
+        """
+        signals = []
+        if key == 'theme':
+            signals.append(('theme_changed', (value,)))
+        elif key == 'editor_font':
+            signals.append(('font_changed', (value, self.get_setting('editor_font_size'))))
+        elif key == 'editor_font_size':
+            signals.append(('font_changed', (self.get_setting('editor_font'), value)))
+        elif key == 'syntax_highlighting_style':
+            signals.append(('syntax_style_changed', (value,)))
+        elif key in ['provider', 'model', 'api_key', 'temperature', 'top_k', 'context_limit']:
+            signals.append(('llm_config_changed', ()))
+        elif key.startswith('rag_'):
+            # Emit rag_config_changed for *any* RAG-related setting change
+            signals.append(('rag_config_changed', ()))
+
+        if key == 'rag_local_sources':
+            # Specific signal for local sources list itself
+            signals.append(('local_rag_sources_changed', (self.get_local_rag_sources(),)))
+        elif key == 'user_prompts':
+            signals.append(('prompts_changed', ()))
+
+        for signal_name, args in signals:
+            if already_emitted is not None:
+                if signal_name in already_emitted:
+                    continue
+                already_emitted.add(signal_name)
+            getattr(self, signal_name).emit(*args)
+
+    # --- Batched Updates ---
+    def begin_batch(self):
+        """Defers change signals from set_setting() until end_batch(). Not re-entrant."""
+        if self._batch_originals is not None:
+            logger.warning("SettingsService: begin_batch() called while already batching; continuing batch.")
+            return
+        self._batch_originals = {}
+
+    def end_batch(self, emit_diff: bool):
+        """Ends a batch. emit_diff=True emits each signal once for the net changes;
+        False rolls the batched changes back without emitting anything."""
+        originals, self._batch_originals = self._batch_originals, None
+        if not originals:
+            return
+        if not emit_diff:
+            self._settings.update(originals)
+            self._invalidate_prompt_index()
+            logger.debug(f"SettingsService: Rolled back {len(originals)} batched setting change(s).")
+            return
+
+        changed_keys = [key for key, old_value in originals.items() if self._settings.get(key) != old_value]
+        emitted = set()
+        for key in changed_keys:
+            self.settings_changed.emit(key, self._settings[key])
+        for key in changed_keys:
+            self._emit_specific_signals(key, self._settings[key], emitted)
+        logger.debug(f"SettingsService: Batch ended, {len(changed_keys)} setting(s) changed.")
+
+    # --- User Prompt Lookup ---
+    @Slot()
+    def _invalidate_prompt_index(self):
+        self._prompt_index = None
+
+    def _get_prompt_index(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the cached id -> prompt map, rebuilding it in one pass if stale."""
+        if self._prompt_index is None:
+            self._prompt_index = {p['id']: p for p in self._settings.get('user_prompts', [])
+                                  if isinstance(p, dict) and p.get('id')}
+        return self._prompt_index
+
+    def get_prompt_by_id(self, prompt_id: str) -> Optional[Dict[str, Any]]:
+        prompt = self._get_prompt_index().get(prompt_id)
+        return prompt.copy() if prompt else None
+
+    def get_prompts_by_ids(self, prompt_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Returns {id: prompt copy} for the IDs that exist; unknown IDs are omitted."""
+        index = self._get_prompt_index()
+        return {pid: index[pid].copy() for pid in prompt_ids if pid in index}
+
+    def delete_prompts(self, prompt_ids: List[str]) -> List[str]:
+        """Removes all given prompts in one update (one prompts_changed). Returns IDs not found."""
+        ids_to_delete = set(prompt_ids)
+        current_prompts = self._settings.get('user_prompts', [])
+        kept_prompts = [p for p in current_prompts if not (isinstance(p, dict) and p.get('id') in ids_to_delete)]
+        deleted_ids = ids_to_delete & set(self._get_prompt_index())
+        failed_ids = [pid for pid in prompt_ids if pid not in deleted_ids]
+        if len(kept_prompts) == len(current_prompts):
+            return failed_ids
+
+        logger.info(f"SS: Deleting {len(deleted_ids)} user prompts.")
+        self._settings['user_prompts'] = kept_prompts
+        # Drop deleted prompts from the active selection in the same pass (covered by prompts_changed)
+        selected_ids = self._settings.get('selected_prompt_ids', [])
+        self._settings['selected_prompt_ids'] = [pid for pid in selected_ids if pid not in ids_to_delete]
+        self.settings_changed.emit('user_prompts', [p.copy() for p in kept_prompts])
+        self.prompts_changed.emit()
+        return failed_ids
 
 
     # --- Local RAG Source Management (remains the same logic) ---
@@ -1,22 +1,153 @@
 # pm/core/workspace_manager.py
-from PySide6.QtCore import QObject, Signal, Qt
+from PySide6.QtCore import QObject, Signal, Slot, Qt, QThread, QCoreApplication
 from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem, QTabWidget, QPlainTextEdit, QMessageBox, QApplication # Added QApplication
 from PySide6.QtGui import QFont, QIcon # Added QIcon
 from pathlib import Path
+from collections import OrderedDict
 import os
 from loguru import logger
 import qtawesome as qta
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple, Set, Iterable, Iterator, Callable
 
 from ..ui.highlighter import PygmentsHighlighter
 from .token_utils import count_tokens
 # *** IMPORT FROM NEW CONSTANTS FILE ***
-from .constants import TOKEN_COUNT_ROLE, TREE_TOKEN_SIZE_LIMIT
+from .constants import TOKEN_COUNT_ROLE, IS_DIR_ROLE, PATH_ROLE, TREE_TOKEN_SIZE_LIMIT
 from .project_config import DEFAULT_STYLE, AVAILABLE_PYGMENTS_STYLES
 
 # Constants should ideally be in a central config module
 IGNORE_DIRS = {'.git', '__pycache__', '.venv', 'venv', '.mypy_cache', '.pytest_cache', 'node_modules'}
 IGNORE_EXT = {'.png', '.jpg', '.jpeg', '.gif', '.zip', '.tar', '.gz', '.ico', '.svg', '.db', '.sqlite', '.bin', '.exe', '.dll', '.so', '.o', '.a', '.lib'}
+TREE_SCAN_BATCH_SIZE = 500 # Entries per batch sent from the background scan to the GUI thread
+TREE_CACHE_SIZE = 3 # Detached trees of recently shown projects kept for switching back
+
+# (parent dir key, name, path, is_dir, token_count, token_display)
+TreeEntry = Tuple[str, str, Path, bool, int, str]
+# (fingerprint, detached root item, dir -> checkable descendants)
+CachedTree = Tuple[Tuple[Path, float], QTreeWidgetItem, Dict[str, List[QTreeWidgetItem]]]
+
+def iter_tree_entries(project_path: Path, should_stop: Optional[Callable[[], bool]] = None) -> Iterator[TreeEntry]:
+    """Walks the project top-down, yielding one entry per shown dir/file (parents before children).
+
+    Uses os.scandir directly: dir/file type comes from the directory entry, and the
+    size check reuses the entry's stat, so no extra per-path stat() calls are made.
+    Like os.walk's default, symlinked directories are listed but not descended into,
+    which also rules out symlink cycles.
+    """
+    pending: List[Path] = [project_path]
+    while pending:
+        if should_stop and should_stop():
+            return
+        dir_path = pending.pop()
+        dir_key = str(dir_path)
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            logger.warning(e)
+            continue
+
+        subdirs: List[Path] = []
+        walk_into: List[Path] = [] # Real (non-symlinked) subdirectories
+        files: List[os.DirEntry] = []
+        for entry in entries:
+            name = entry.name
+            if name.startswith('.'):
+                continue
+            try:
+                if entry.is_dir():
+                    if name not in IGNORE_DIRS:
+                        subdir = Path(entry.path)
+                        subdirs.append(subdir)
+                        if not entry.is_symlink():
+                            walk_into.append(subdir)
+                elif os.path.splitext(name)[1].lower() not in IGNORE_EXT and entry.is_file():
+                    files.append(entry)
+            except OSError:
+                continue
+        for subdir in subdirs:
+            yield dir_key, subdir.name, subdir, True, 0, ""
+
+        for entry in files:
+            fpath = Path(entry.path) # Only shown entries get a Path (kept in PATH_ROLE)
+            token_display = "-"
+            token_count = 0
+            try:
+                fsize = entry.stat().st_size
+            except OSError:
+                continue
+            if fsize <= TREE_TOKEN_SIZE_LIMIT:
+                try:
+                    content = fpath.read_text(encoding='utf-8', errors='ignore')
+                    token_count = count_tokens(content) # Still calculate for data role
+                    token_display = f"{token_count:,}"
+                except Exception:
+                    token_display = "Error"
+            else:
+                token_display = f">{TREE_TOKEN_SIZE_LIMIT // 1024}KB"
+            yield dir_key, entry.name, fpath, False, token_count, token_display
+        pending.extend(reversed(walk_into)) # Depth-first in sorted order, like os.walk
+
+
+class FileTreeScanWorker(QObject):
+    """Worker object to walk the project and count file tokens in a background thread."""
+    batch_ready = Signal(int, list) # scan_id, list of TreeEntry
+    finished = Signal(int) # scan_id
+
+    def __init__(self, scan_id: int, project_path: Path):
+        super().__init__()
+        self.scan_id = scan_id
+        self.project_path = project_path
+        self._thread_ref: Optional[QThread] = None
+
+    def assign_thread(self, thread: QThread):
+        self._thread_ref = thread
+
+    def _is_interrupted(self) -> bool:
+        return bool(self._thread_ref and self._thread_ref.isInterruptionRequested())
+
+    @Slot()
+    def run(self):
+        """Streams entries back in batches so the tree fills in while the walk continues."""
+        batch: List[TreeEntry] = []
+        try:
+            for entry in iter_tree_entries(self.project_path, self._is_interrupted):
+                batch.append(entry)
+                if len(batch) >= TREE_SCAN_BATCH_SIZE:
+                    self.batch_ready.emit(self.scan_id, batch)
+                    batch = []
+            if batch and not self._is_interrupted():
+                self.batch_ready.emit(self.scan_id, batch)
+        except Exception as e:
+            logger.exception(f"FileTreeScanWorker: Error scanning {self.project_path}: {e}")
+        finally:
+            self.finished.emit(self.scan_id)
+
+
+class FileSaveWorker(QObject):
+    """Worker object to write an editor snapshot to disk in a background thread."""
+    saved = Signal(object, int) # path, document revision of the snapshot
+    error_occurred = Signal(object, str) # path, error message
+    finished = Signal(object, int) # path, save serial
+
+    def __init__(self, path: Path, text: str, revision: int, serial: int):
+        super().__init__()
+        self.path = path
+        self.text = text
+        self.revision = revision
+        self.serial = serial
+
+    @Slot()
+    def run(self):
+        try:
+            self.path.write_text(self.text, encoding='utf-8')
+            self.saved.emit(self.path, self.revision)
+        except Exception as e:
+            logger.error(f"FileSaveWorker: Could not save {self.path}: {e}")
+            self.error_occurred.emit(self.path, str(e))
+        finally:
+            self.finished.emit(self.path, self.serial)
+
 
 class WorkspaceManager(QObject):
     """Manages project state, file tree, and editor tabs."""
@@ -24,115 +155,263 @@ class WorkspaceManager(QObject):
     editors_changed = Signal()          # Emitted when tabs are opened/closed
     file_saved = Signal(Path)           # Emitted when a file is successfully saved
     file_operation_error = Signal(str)  # Emitted on file load/save/create errors
+    file_tree_populated = Signal()      # Emitted when a file tree population completes
 
     def __init__(self, initial_project_path: Path, settings: dict, parent=None):
         super().__init__(parent)
         self._project_path = initial_project_path
+        self._project_path_str = str(initial_project_path) if initial_project_path else ""
         self._settings = settings # Keep settings reference for font, etc.
         # Path -> Widget mapping for open editor tabs
         self.open_editors: Dict[Path, QPlainTextEdit] = {}
+        # Directory path -> flat list of its checkable descendant items, built with the tree
+        self._dir_descendants: Dict[str, List[QTreeWidgetItem]] = {}
+        self._tree_fingerprint: Optional[Tuple[Path, float]] = None # (project path, root mtime) last populated
+        self._tree_key: Optional[str] = None # Project path string of the displayed tree
+        self._tree_complete = False # False while a background scan is still filling the tree
+        # Project path string -> detached tree of a recently shown project, least recent first
+        self._tree_cache: "OrderedDict[str, CachedTree]" = OrderedDict()
+        self._tree_items: Dict[str, QTreeWidgetItem] = {}
+        self._ancestor_keys: Dict[str, List[str]] = {}
+        # Background scans: only batches from the current scan_id are applied
+        self._scan_id = 0
+        self._scan_tree_widget: Optional[QTreeWidget] = None
+        self._scan_threads: Dict[int, Tuple[QThread, "FileTreeScanWorker"]] = {}
+        # Background saves: one in flight per path, repeat requests coalesce into one follow-up save
+        self._save_serial = 0
+        self._save_threads: Dict[int, Tuple[QThread, FileSaveWorker]] = {}
+        self._saving_paths: Dict[Path, int] = {}
+        self._resave_requested: Set[Path] = set()
         logger.info(f"WorkspaceManager initialized for path: {initial_project_path}")
 
     @property
     def project_path(self) -> Path:
         return self._project_path
 
+    @property
+    def project_path_str(self) -> str:
+        """String form of project_path, converted once per project change."""
+        return self._project_path_str
+
     def set_project_path(self, new_path: Path):
         """Sets a new project path, clearing existing editors."""
         new_path = Path(new_path).resolve() # Ensure absolute path
         if new_path != self._project_path and new_path.is_dir():
             logger.info(f"WorkspaceManager: Setting project path to {new_path}")
             self._project_path = new_path
-            self.open_editors.clear() # Clear editors from old project
+            self._project_path_str = str(new_path)
             # MainWindow is responsible for saving/loading the '.patchmind.json' config
+            # Listeners close the old project's tabs (one editors_changed via close_all_tabs)
             self.project_changed.emit(new_path)
-            self.editors_changed.emit()
+            if self.open_editors: # Nobody closed them: drop stale editors and notify once
+                self.open_editors.clear()
+                self.editors_changed.emit()
         elif not new_path.is_dir():
              error_msg = f"Invalid project path selected: {new_path}"
              logger.error(f"WorkspaceManager: {error_msg}")
              self.file_operation_error.emit(error_msg)
 
-    def populate_file_tree(self, tree_widget: QTreeWidget):
+    def _current_tree_fingerprint(self) -> Optional[Tuple[Path, float]]:
+        try:
+            return (self._project_path.resolve(), self._project_path.stat().st_mtime)
+        except OSError:
+            return None
+
+    def populate_file_tree(self, tree_widget: QTreeWidget, force: bool = True, background: bool = False):
+        """Shows the project's file tree, rebuilding it unless a warm copy can be reused.
+
+        The trees of recently shown projects are kept detached with their fingerprint
+        (path + root mtime). With force=False, switching back to such a project re-attaches
+        its cached tree (check states included) when the fingerprint still matches.
+        With background=True the walk and token counting run in a worker thread and items are
+        added in batches as they arrive; file_tree_populated is emitted once the tree is complete.
+        """
+        self._stop_tree_scan() # A newer population supersedes any scan still running
+        self._stash_displayed_tree(tree_widget)
         if not self._project_path or not self._project_path.is_dir():
             logger.error("Wks Mgr: Populate tree fail - invalid path.")
-            tree_widget.clear(); return
-
-        logger.info(f"Wks Mgr: Populating file tree for {self._project_path}")
-        tree_widget.blockSignals(True); tree_widget.clear()
+            tree_widget.clear()
+            return
+
+        fingerprint = self._current_tree_fingerprint()
+        cached = self._tree_cache.pop(self._project_path_str, None)
+        if not force and cached is not None and fingerprint is not None and cached[0] == fingerprint:
+            self._restore_cached_tree(tree_widget, cached)
+            return
+        self._tree_fingerprint = fingerprint
+
+        logger.info(f"Wks Mgr: Populating file tree for {self._project_path} (background={background})")
+        self._begin_tree(tree_widget)
+        if background:
+            self._start_tree_scan(tree_widget)
+            return
+        tree_widget.blockSignals(True)
+        try:
+            self._add_tree_entries(iter_tree_entries(self._project_path))
+        except Exception as e:
+             logger.exception(f"Wks Mgr: Error during tree population: {e}")
+        finally:
+            tree_widget.expandToDepth(0)
+            tree_widget.blockSignals(False)
+            logger.info("Wks Mgr: File tree population finished.")
+        self._tree_complete = True
+        self.file_tree_populated.emit()
+
+    # --- Warm Tree Cache (recently shown projects) ---
+    def _stash_displayed_tree(self, tree_widget: QTreeWidget):
+        """Detaches the displayed tree into the cache if it is complete."""
+        key = self._tree_key
+        self._tree_key = None
+        if key is None or not self._tree_complete or self._tree_fingerprint is None \
+                or tree_widget.topLevelItemCount() != 1:
+            return
+        tree_widget.blockSignals(True)
+        try:
+            root_item = tree_widget.takeTopLevelItem(0)
+        finally:
+            tree_widget.blockSignals(False)
+        self._tree_cache[key] = (self._tree_fingerprint, root_item, self._dir_descendants)
+        self._tree_cache.move_to_end(key)
+        while len(self._tree_cache) > TREE_CACHE_SIZE:
+            self._tree_cache.popitem(last=False)
+        self._dir_descendants = {}
+        self._tree_items = {} # Build-time lookups must not keep cached/evicted items alive
+        self._ancestor_keys = {}
+
+    def _restore_cached_tree(self, tree_widget: QTreeWidget, cached: CachedTree):
+        fingerprint, root_item, dir_descendants = cached
+        logger.debug("Wks Mgr: Reusing cached file tree for {}.", self._project_path)
+        tree_widget.blockSignals(True)
+        try:
+            tree_widget.clear()
+            tree_widget.addTopLevelItem(root_item)
+            tree_widget.expandToDepth(0)
+        finally:
+            tree_widget.blockSignals(False)
+        self._dir_descendants = dir_descendants
+        self._tree_fingerprint = fingerprint
+        self._tree_key = self._project_path_str
+        self._tree_complete = True
+        self.file_tree_populated.emit()
+
+    # --- Tree Building (shared by the synchronous and background paths) ---
+    def _begin_tree(self, tree_widget: QTreeWidget):
+        """Clears the tree and adds the (non-checkable) project root item."""
+        tree_widget.blockSignals(True)
         try:
+            tree_widget.clear()
             proj_root_item = QTreeWidgetItem(tree_widget, [self._project_path.name, ""])
             proj_root_item.setIcon(0, qta.icon('fa5s.folder-open', color='lightblue'))
             proj_root_item.setData(0, Qt.UserRole, str(self._project_path))
+            proj_root_item.setData(0, IS_DIR_ROLE, True)
+            proj_root_item.setData(0, PATH_ROLE, self._project_path)
             # Root item itself is NOT checkable
             proj_root_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            logger.trace(f"ROOT '{proj_root_item.text(0)}': Flags set. Flags: {proj_root_item.flags()}")
-            tree_items = {str(self._project_path): proj_root_item}
-
-            for root, dirs, files in os.walk(self._project_path, topdown=True, onerror=logger.warning):
-                root_path = Path(root)
-                dirs[:] = [d for d in dirs if d not in IGNORE_DIRS and not d.startswith('.')]
-                parent_item = tree_items.get(str(root_path))
-                if parent_item is None: continue
-
-                # Process Directories
-                for dname in sorted(dirs):
-                     dir_path = root_path / dname
-                     item = QTreeWidgetItem(parent_item, [dname, ""])
-                     item.setIcon(0, qta.icon('fa5s.folder', color='lightgray'))
-                     item.setData(0, Qt.UserRole, str(dir_path))
-                     # --- Explicitly set flags for Dirs ---
-                     required_flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
-                     logger.trace(f"  DIR '{dname}': Setting flags to {required_flags}")
-                     item.setFlags(required_flags)
-                     final_flags = item.flags()
-                     is_checkable = bool(final_flags & Qt.ItemIsUserCheckable)
-                     logger.trace(f"  DIR '{dname}': Flags SET. IsCheckable={is_checkable}. Final Flags: {final_flags}")
-                     # --- End Flags ---
-                     item.setCheckState(0, Qt.Checked)
-                     tree_items[str(dir_path)] = item
-
-                # Process Files
-                for fname in sorted(files):
-                    fpath = root_path / fname
-                    if fname.startswith('.') or fpath.suffix.lower() in IGNORE_EXT: continue
-
-                    # --- Simplified token display for now ---
-                    token_display = "-"
-                    token_count = 0
-                    # (Keep token calculation logic commented out temporarily if needed)
-                    try:
-                        fsize = fpath.stat().st_size
-                        if fsize <= TREE_TOKEN_SIZE_LIMIT:
-                           try:
-                               content = fpath.read_text(encoding='utf-8', errors='ignore')
-                               token_count = count_tokens(content) # Still calculate for data role
-                               token_display = f"{token_count:,}"
-                           except Exception: token_display = "Error"
-                        else: token_display = f">{TREE_TOKEN_SIZE_LIMIT // 1024}KB"
-                    except OSError: token_display = "N/A"; continue
-                    # --- End Simplified ---
-
-                    item = QTreeWidgetItem(parent_item, [fname, token_display])
-                    item.setIcon(0, qta.icon('fa5s.file-code', color='darkgray'))
-                    item.setData(0, Qt.UserRole, str(fpath))
-                    item.setData(0, TOKEN_COUNT_ROLE, token_count)
-                    # --- Explicitly set flags for Files ---
-                    required_flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
-                    logger.trace(f"  FILE '{fname}': Setting flags to {required_flags}")
-                    item.setFlags(required_flags)
-                    final_flags = item.flags()
-                    is_checkable = bool(final_flags & Qt.ItemIsUserCheckable)
-                    logger.trace(f"  FILE '{fname}': Flags SET. IsCheckable={is_checkable}. Final Flags: {final_flags}")
-                    # --- End Flags ---
-                    item.setCheckState(0, Qt.Checked)
-                    item.setTextAlignment(1, Qt.AlignRight | Qt.AlignVCenter)
-
+        finally:
+            tree_widget.blockSignals(False)
+        self._dir_descendants = {}
+        self._tree_key = self._project_path_str
+        self._tree_complete = False
+        self._tree_items = {str(self._project_path): proj_root_item}
+        # Directory key -> keys of the checkable dirs whose subtree contains its children
+        self._ancestor_keys = {str(self._project_path): []}
+
+    def _add_tree_entries(self, entries: Iterable[TreeEntry]):
+        """Creates items for scanned entries; parents always precede their children."""
+        checkable_flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+        for parent_key, name, path, is_dir, token_count, token_display in entries:
+            parent_item = self._tree_items.get(parent_key)
+            if parent_item is None:
+                continue
+            item = QTreeWidgetItem(parent_item, [name, token_display])
+            item.setData(0, Qt.UserRole, str(path))
+            item.setData(0, IS_DIR_ROLE, is_dir)
+            item.setData(0, PATH_ROLE, path)
+            item.setFlags(checkable_flags)
+            item.setCheckState(0, Qt.Checked)
+            if is_dir:
+                item.setIcon(0, qta.icon('fa5s.folder', color='lightgray'))
+            else:
+                item.setIcon(0, qta.icon('fa5s.file-code', color='darkgray'))
+                item.setData(0, TOKEN_COUNT_ROLE, token_count)
+                item.setTextAlignment(1, Qt.AlignRight | Qt.AlignVCenter)
+            for key in self._ancestor_keys[parent_key]:
+                self._dir_descendants[key].append(item)
+            if is_dir:
+                key = str(path)
+                self._tree_items[key] = item
+                self._dir_descendants[key] = []
+                self._ancestor_keys[key] = self._ancestor_keys[parent_key] + [key]
+
+    # --- Background Tree Scan ---
+    def _start_tree_scan(self, tree_widget: QTreeWidget):
+        self._scan_id += 1
+        self._scan_tree_widget = tree_widget
+        thread = QThread(self) # Parented: Qt owns it even if our reference is dropped
+        thread.setObjectName(f"FileTreeScanThread_{self._scan_id}")
+        worker = FileTreeScanWorker(self._scan_id, self._project_path)
+        worker.assign_thread(thread)
+        self._scan_threads[self._scan_id] = (thread, worker)
+        worker.moveToThread(thread)
+
+        worker.batch_ready.connect(self._on_tree_batch_ready)
+        worker.finished.connect(self._on_tree_scan_finished)
+        thread.started.connect(worker.run)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.finished.connect(lambda sid=self._scan_id: self._scan_threads.pop(sid, None))
+        thread.start()
+        logger.debug(f"Wks Mgr: Started background tree scan ({thread.objectName()}).")
+
+    def _stop_tree_scan(self):
+        """Interrupts the running scan (if any); its remaining batches are ignored."""
+        running = self._scan_threads.get(self._scan_id)
+        if running:
+            running[0].requestInterruption()
+        self._scan_id += 1
+
+    def stop_tree_scans(self, timeout_ms: int = 2000):
+        """Interrupts every running tree scan and waits for its thread (e.g. on app close)."""
+        self._stop_tree_scan()
+        for scan_id, (thread, _worker) in list(self._scan_threads.items()):
+            try:
+                if thread.isRunning():
+                    thread.requestInterruption()
+                    thread.quit()
+                    if not thread.wait(timeout_ms):
+                        logger.warning(f"Wks Mgr: {thread.objectName()} did not finish in {timeout_ms} ms.")
+            except RuntimeError: # Already deleted by deleteLater
+                pass
+            self._scan_threads.pop(scan_id, None)
+
+    @Slot(int, list)
+    def _on_tree_batch_ready(self, scan_id: int, entries: list):
+        if scan_id != self._scan_id or self._scan_tree_widget is None:
+            return # Superseded scan
+        tree_widget = self._scan_tree_widget
+        tree_widget.setUpdatesEnabled(False) # One repaint per batch, not per item
+        tree_widget.blockSignals(True)
+        try:
+            self._add_tree_entries(entries)
         except Exception as e:
-             logger.exception(f"Wks Mgr: Error during tree population: {e}")
+            logger.exception(f"Wks Mgr: Error adding scanned tree entries: {e}")
         finally:
-            tree_widget.expandToDepth(0)
             tree_widget.blockSignals(False)
-            logger.info("Wks Mgr: File tree population finished.")
+            tree_widget.setUpdatesEnabled(True)
+
+    @Slot(int)
+    def _on_tree_scan_finished(self, scan_id: int):
+        if scan_id != self._scan_id or self._scan_tree_widget is None:
+            return
+        self._scan_tree_widget.expandToDepth(0)
+        self._tree_complete = True
+        logger.info("Wks Mgr: File tree population finished (background).")
+        self.file_tree_populated.emit()
+
+    def checkable_descendants(self, dir_path_str: str) -> Optional[List[QTreeWidgetItem]]:
+        """Returns every checkable item below a directory in the current tree, or None if unknown."""
+        return self._dir_descendants.get(dir_path_str)
 
     def load_file(self, path: Path, tab_widget: QTabWidget) -> Optional[QPlainTextEdit]:
         """Loads a file into the editor tab widget, returns the editor widget."""
@@ -185,6 +464,8 @@ class WorkspaceManager(QObject):
             editor = QPlainTextEdit()
             editor.setPlainText(text)
             editor.setObjectName(str(path)) # Store path for later retrieval (save, close)
+            # Cheap marker for handlers: one attribute lookup instead of isinstance/hasattr probes
+            editor._gs_is_editor = True
 
             # Apply font from settings
             font_name = self._settings.get("editor_font", "Fira Code")
@@ -233,10 +514,10 @@ class WorkspaceManager(QObject):
     def _guess_lang(self, path: Path) -> str | None:
          ext = path.suffix.lower(); mapping = {'.py':'python','.js':'javascript','.ts':'typescript','.html':'html','.css':'css','.json':'json','.yaml':'yaml','.yml':'yaml','.go':'go','.rb':'ruby','.sh':'bash','.toml':'toml','.ini':'ini','.md':'markdown','.java':'java','.c':'c','.cpp':'cpp','.h':'c','.hpp':'cpp','.cs':'csharp','.xml':'xml','.sql':'sql','.php':'php','.pl':'perl','.kt':'kotlin','.swift':'swift','.rs':'rust'}; return mapping.get(ext)
 
-    def close_tab(self, index: int, tab_widget: QTabWidget):
-        """Closes an editor tab, removing internal reference."""
+    def close_tab(self, index: int, tab_widget: QTabWidget) -> bool:
+        """Closes an editor tab, removing internal reference. Returns True if it was tracked."""
         widget = tab_widget.widget(index)
-        if widget and isinstance(widget, QPlainTextEdit):
+        if getattr(widget, '_gs_is_editor', False):
              path_to_remove = Path(widget.objectName()) # Retrieve path from object name
              # TODO: Add check for unsaved changes before closing
              tab_widget.removeTab(index)
@@ -244,9 +525,30 @@ class WorkspaceManager(QObject):
                   del self.open_editors[path_to_remove]
                   logger.info(f"WorkspaceManager: Closed tab {path_to_remove.name}")
                   self.editors_changed.emit()
-             else:
-                  logger.warning(f"WorkspaceManager: Closed tab for path {path_to_remove} not found in internal dict.")
+                  widget.deleteLater()
+                  return True
+             logger.warning(f"WorkspaceManager: Closed tab for path {path_to_remove} not found in internal dict.")
              widget.deleteLater()
+        return False
+
+    def close_all_tabs(self, tab_widget: QTabWidget):
+        """Removes every tab in one pass and emits editors_changed once."""
+        tab_widget.blockSignals(True) # No currentChanged per removed tab
+        # One repaint after the loop; the tab bar's own visibility is left alone
+        tab_widget.setUpdatesEnabled(False)
+        try:
+            while tab_widget.count(): # Last to first: no index shifting for the remaining tabs
+                index = tab_widget.count() - 1
+                widget = tab_widget.widget(index)
+                tab_widget.removeTab(index)
+                if widget:
+                    widget.deleteLater()
+        finally:
+            tab_widget.setUpdatesEnabled(True)
+            tab_widget.blockSignals(False)
+        logger.info(f"WorkspaceManager: Closed all tabs ({len(self.open_editors)} editors).")
+        self.open_editors.clear()
+        self.editors_changed.emit()
 
     def save_tab_content(self, editor: QPlainTextEdit) -> bool:
         """Saves the content of a specific editor widget to its file."""
@@ -256,6 +558,7 @@ class WorkspaceManager(QObject):
              self.file_operation_error.emit("Cannot save file: Path unknown.")
              return False
         current_path = Path(path_str)
+        self._wait_for_save(current_path) # An older background write must not land after this one
         try:
             text = editor.toPlainText()
             current_path.write_text(text, encoding='utf-8')
@@ -270,10 +573,112 @@ class WorkspaceManager(QObject):
             self.file_operation_error.emit(error_msg)
             return False
 
+    def save_tab_content_async(self, editor: QPlainTextEdit) -> bool:
+        """Saves an editor's content from a worker thread. Returns False if the save could not start.
+
+        The document is only marked unmodified once the write succeeds, and only if it was not
+        edited meanwhile. A save requested while one is running for the same file is coalesced
+        into a single follow-up save of the latest content.
+        """
+        path_str = editor.objectName()
+        if not path_str:
+             logger.error("WorkspaceManager: Cannot save tab, editor has no path associated (objectName is empty).")
+             self.file_operation_error.emit("Cannot save file: Path unknown.")
+             return False
+        path = Path(path_str)
+        if path in self._saving_paths:
+            self._resave_requested.add(path)
+            return True
+
+        self._save_serial += 1
+        serial = self._save_serial
+        thread = QThread(self)
+        thread.setObjectName(f"FileSaveThread_{serial}")
+        # Snapshot on the GUI thread; the worker only touches the disk
+        worker = FileSaveWorker(path, editor.toPlainText(), editor.document().revision(), serial)
+        self._save_threads[serial] = (thread, worker)
+        self._saving_paths[path] = serial
+        worker.moveToThread(thread)
+
+        worker.saved.connect(self._on_background_save_done)
+        worker.error_occurred.connect(self._on_background_save_error)
+        worker.finished.connect(self._on_background_save_finished)
+        thread.started.connect(worker.run)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.finished.connect(lambda s=serial: self._save_threads.pop(s, None))
+        thread.start()
+        logger.debug(f"WorkspaceManager: Saving {path} in background ({thread.objectName()}).")
+        return True
+
+    @Slot(object, int)
+    def _on_background_save_done(self, path: Path, revision: int):
+        logger.info(f'WorkspaceManager: Saved {path}')
+        editor = self.open_editors.get(path)
+        if editor is not None and editor.document().revision() == revision:
+            editor.document().setModified(False) # Unchanged since the snapshot
+        self.file_saved.emit(path)
+
+    @Slot(object, str)
+    def _on_background_save_error(self, path: Path, error: str):
+        self._resave_requested.discard(path)
+        self.file_operation_error.emit(f"Could not save file:\n{path}\n\nError: {error}")
+
+    @Slot(object, int)
+    def _on_background_save_finished(self, path: Path, serial: int):
+        if self._saving_paths.get(path) != serial:
+            return # Already joined by _wait_for_save, which took over this file
+        self._saving_paths.pop(path)
+        if path in self._resave_requested:
+            self._resave_requested.discard(path)
+            editor = self.open_editors.get(path)
+            if editor is not None and editor.document().isModified():
+                self.save_tab_content_async(editor)
+
+    def _join_save_thread(self, thread: QThread, timeout_ms: int) -> bool:
+        """Quits a save thread once its write returns and waits for it. Returns False on timeout."""
+        try:
+            thread.quit() # The worker's own quit is queued to this (blocked) thread
+            if not thread.wait(timeout_ms):
+                logger.warning(f"WorkspaceManager: {thread.objectName()} did not finish in {timeout_ms} ms.")
+                return False
+        except RuntimeError: # Already deleted by deleteLater
+            pass
+        return True
+
+    def _wait_for_save(self, path: Path, timeout_ms: int = 5000):
+        """Blocks until a background save of this file (if any) has written to disk."""
+        serial = self._saving_paths.get(path)
+        if serial is None:
+            return
+        self._resave_requested.discard(path) # The caller writes the latest content itself
+        running = self._save_threads.get(serial)
+        if running and not self._join_save_thread(running[0], timeout_ms):
+            return
+        # Its queued saved/error signals still arrive later; the revision check keeps them harmless
+        self._saving_paths.pop(path, None)
+
+    def wait_for_pending_saves(self, timeout_ms: int = 5000):
+        """Blocks until every background save, including coalesced re-saves, has finished and been applied.
+
+        Used before closing the app so the unsaved-changes check sees the saved documents as unmodified.
+        A save that times out leaves its tab modified, so it is still reported as unsaved.
+        """
+        while self._save_threads:
+            for serial, (thread, _worker) in list(self._save_threads.items()):
+                if not self._join_save_thread(thread, timeout_ms):
+                    return
+                self._save_threads.pop(serial, None)
+            # The joined workers' saved/error/finished signals are queued to this blocked thread:
+            # deliver them now, which clears modified flags and starts any coalesced re-save
+            QCoreApplication.sendPostedEvents(self)
+
     # --- ADDED METHOD for Change Queue ---
     def save_tab_content_directly(self, file_path: Path, content: str) -> bool:
         """Saves the given content directly to the specified file path."""
         logger.info(f"WorkspaceManager: Directly saving content to {file_path}")
+        self._wait_for_save(file_path)
         try:
             # Ensure parent directory exists (optional, but good practice)
             # file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -1,5 +1,4 @@
 # pm/handlers/change_queue_handler.py
-import re
 import uuid
 import difflib # For matching
 from pathlib import Path
@@ -13,6 +12,7 @@ from loguru import logger
 from ..ui.change_queue_widget import ChangeQueueWidget
 from ..ui.diff_dialog import DiffDialog
 from ..core.workspace_manager import WorkspaceManager
+from ..core.change_detection import iter_change_blocks
 from ..ui.controllers.status_bar_controller import StatusBarController
 
 
@@ -320,18 +320,12 @@ class ChangeQueueHandler(QObject):
         proposal to the ChangeQueueWidget.
         """
         logger.debug("ChangeQueueHandler: Received potential change content. Parsing...")
-        # Regex to find blocks marked by ### START/END FILE: ... ###
-        change_pattern = re.compile(
-            r"### START FILE: (?P<filepath>.*?) ###\n(?P<content>.*?)\n### END FILE: (?P=filepath) ###",
-            re.DOTALL | re.MULTILINE
-        )
-        matches = change_pattern.finditer(ai_content_with_markers)
+        # Blocks marked by ### START/END FILE: ... ### (substring scan, module-level regex fallback)
         changes_added = 0
 
-        for match in matches:
+        for filepath, proposed_content, _ in iter_change_blocks(ai_content_with_markers):
             try:
-                relative_path_str = match.group('filepath').strip()
-                proposed_content = match.group('content')
+                relative_path_str = filepath.strip()
 
                 if not relative_path_str:
                     logger.warning("Skipping change block with empty file path.")
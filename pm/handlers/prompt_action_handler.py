@@ -1,5 +1,5 @@
 # pm/handlers/prompt_action_handler.py
-from PySide6.QtCore import QObject, Signal, Slot
+from PySide6.QtCore import QObject, Signal, Slot, QTimer
 from PySide6.QtWidgets import QMainWindow, QMessageBox # For dialog parent
 from loguru import logger
 from typing import Optional, List
@@ -10,6 +10,9 @@ from ..core.settings_service import SettingsService
 from ..ui.config_dock import ConfigDock
 # from ..ui.prompt_editor_dialog import PromptEditorDialog # Import when created
 
+SELECTION_WRITE_DEBOUNCE_MS = 150
+STUB_STATUS_TIMEOUT_MS = 3000
+
 class PromptActionHandler(QObject):
     """Handles interactions related to prompt management in the ConfigDock."""
 
@@ -25,24 +28,43 @@ class PromptActionHandler(QObject):
         self._settings_service: SettingsService = core.settings
         self._config_dock = config_dock
 
+        # Zero-delay single-shot: a burst of refresh requests yields one populate pass
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(0)
+        self._refresh_timer.timeout.connect(self._do_refresh)
+
+        # Debounce selection writes: a burst of reorders/toggles becomes one set_setting
+        self._pending_selected_ids: Optional[List[str]] = None
+        self._write_timer = QTimer(self)
+        self._write_timer.setSingleShot(True)
+        self._write_timer.setInterval(SELECTION_WRITE_DEBOUNCE_MS)
+        self._write_timer.timeout.connect(self._flush_selected_prompts)
+
+        # Hashes of what the dock lists currently show; unchanged data skips the rebuild
+        self._last_prompts_hash: Optional[int] = None
+        self._last_selected_hash: Optional[int] = None
+
         # --- Connect Signals from ConfigDock ---
         self._config_dock.request_prompt_new.connect(self.handle_new_prompt)
         self._config_dock.request_prompt_edit.connect(self.handle_edit_prompt)
         self._config_dock.request_prompt_delete.connect(self.handle_delete_prompt)
         self._config_dock.selected_prompts_changed.connect(self.handle_selected_prompts_changed)
 
-        # Connect to SettingsService to update dock when prompts change externally
-        # TODO: Add prompts_changed signal to SettingsService if needed
-        # self._settings_service.settings_changed.connect(self._handle_settings_change)
+        # Connect to SettingsService to update dock when prompts change (one emit per batch)
+        self._settings_service.prompts_changed.connect(self.update_config_dock_prompts)
 
         logger.info("PromptActionHandler initialized.")
         # Initial population handled by MainWindow via settings_loaded -> _populate_config_dock
 
-    # TODO: Add slot for settings_changed if dynamic updates are needed
-    # @Slot(str, object)
-    # def _handle_settings_change(self, key: str, value: object):
-    #     if key == 'prompts' or key == 'selected_prompt_ids':
-    #          self._update_config_dock_prompts()
+    def _show_stub(self, message: str):
+        """Reports an unimplemented action: a modal box, or a status message when
+        'debug.show_stub_dialogs' is off (no nested event loop, e.g. headless/CI runs)."""
+        logger.info(f"PromptActionHandler: Not implemented - {message}")
+        if self._settings_service.get_setting('debug.show_stub_dialogs', True):
+            QMessageBox.information(self._main_window, "Not Implemented", message)
+            return
+        self._main_window.statusBar().showMessage(f"Not implemented: {message}", STUB_STATUS_TIMEOUT_MS)
 
     @Slot()
     def handle_new_prompt(self):
@@ -58,18 +80,18 @@ class PromptActionHandler(QObject):
         #             # SettingsService should emit signal to update dock
         #         else:
         #             QMessageBox.warning(self._main_window, "Error", "Failed to add new prompt.")
-        QMessageBox.information(self._main_window, "Not Implemented", "Creating new prompts requires PromptEditorDialog and SettingsService integration.")
+        self._show_stub("Creating new prompts requires PromptEditorDialog and SettingsService integration.")
 
 
     @Slot(str)
     def handle_edit_prompt(self, prompt_id: str):
         """Handles the request to edit an existing prompt."""
         logger.debug(f"Edit prompt requested for ID: {prompt_id}")
-        # TODO: Implement PromptEditorDialog & SettingsService methods
-        # prompt_data = self._settings_service.get_prompt_by_id(prompt_id) # Assuming method exists
-        # if not prompt_data:
-        #     QMessageBox.warning(self._main_window, "Error", f"Prompt with ID {prompt_id} not found.")
-        #     return
+        prompt_data = self._settings_service.get_prompt_by_id(prompt_id) # O(1) via cached index
+        if not prompt_data:
+            QMessageBox.warning(self._main_window, "Error", f"Prompt with ID {prompt_id} not found.")
+            return
+        # TODO: Implement PromptEditorDialog & SettingsService update_prompt
         # dialog = PromptEditorDialog(prompt_data=prompt_data, parent=self._main_window)
         # if dialog.exec():
         #     updated_data = dialog.get_prompt_data()
@@ -79,35 +101,52 @@ class PromptActionHandler(QObject):
         #             # SettingsService should emit signal to update dock
         #         else:
         #             QMessageBox.warning(self._main_window, "Error", "Failed to update prompt.")
-        QMessageBox.information(self._main_window, "Not Implemented", "Editing prompts requires PromptEditorDialog and SettingsService integration.")
+        self._show_stub("Editing prompts requires PromptEditorDialog and SettingsService integration.")
 
     @Slot(list)
     def handle_delete_prompt(self, prompt_ids: List[str]):
         """Handles the request to delete prompts."""
+        prompt_ids = list(dict.fromkeys(prompt_ids)) # Drop duplicate IDs, keep order
         if not prompt_ids: return
         logger.debug(f"Delete prompts requested for IDs: {prompt_ids}")
         # Confirmation should happen in ConfigDock before emitting signal
 
-        # TODO: Implement prompt deletion in SettingsService
-        # deleted_count = 0
-        # errors = []
-        # for prompt_id in prompt_ids:
-        #     if self._settings_service.delete_prompt(prompt_id): # Assuming method exists
-        #         deleted_count += 1
-        #     else:
-        #         errors.append(prompt_id)
-        # logger.info(f"Deleted {deleted_count} of {len(prompt_ids)} prompts.")
-        # if errors:
-        #      QMessageBox.warning(self._main_window, "Deletion Issue", f"Could not delete prompts: {', '.join(errors)}")
-        # # SettingsService should emit signal to update dock
-        QMessageBox.information(self._main_window, "Not Implemented", f"Deleting {len(prompt_ids)} prompts requires SettingsService integration.")
+        self._flush_selected_prompts() # Pending selection must not resurrect deleted IDs
+
+        # Resolve every name in one pass instead of one lookup per ID
+        prompts_by_id = self._settings_service.get_prompts_by_ids(prompt_ids)
+
+        # One batched delete -> one prompts_changed -> one dock rebuild
+        failed_ids = self._settings_service.delete_prompts(prompt_ids)
+        deleted_count = len(prompt_ids) - len(failed_ids)
+        logger.info(f"Deleted {deleted_count} of {len(prompt_ids)} prompts.")
+        if deleted_count:
+            deleted_names = [p.get('name', pid) for pid, p in prompts_by_id.items() if pid not in failed_ids]
+            logger.debug(f"Deleted prompts: {deleted_names}")
+        if failed_ids:
+            QMessageBox.warning(self._main_window, "Deletion Issue", f"Could not delete prompts: {', '.join(failed_ids)}")
+        # SettingsService emits a single prompts_changed to update dock
 
 
     @Slot(list)
     def handle_selected_prompts_changed(self, selected_ids: List[str]):
         """Handles changes in the active/selected prompt list from ConfigDock."""
+        if selected_ids == self._settings_service.get_setting('selected_prompt_ids', []):
+            # Back to the stored value (or a benign re-emit): nothing to write, drop any pending write
+            self._pending_selected_ids = None
+            self._write_timer.stop()
+            return
         logger.debug(f"Selected prompt IDs updated by ConfigDock: {selected_ids}")
-        # Update the setting via SettingsService
+        self._pending_selected_ids = list(selected_ids)
+        self._write_timer.start() # Restarting resets the delay
+
+    @Slot()
+    def _flush_selected_prompts(self):
+        """Writes the latest pending selection to SettingsService."""
+        self._write_timer.stop()
+        if self._pending_selected_ids is None:
+            return
+        selected_ids, self._pending_selected_ids = self._pending_selected_ids, None
         # Use a specific key for the ordered list of active prompt IDs
         self._settings_service.set_setting('selected_prompt_ids', selected_ids)
         # SettingsService emits settings_changed signal automatically
@@ -116,10 +155,32 @@ class PromptActionHandler(QObject):
     # This method is called by MainWindow when settings are reloaded
     @Slot()
     def update_config_dock_prompts(self):
+        """Schedules a ConfigDock prompt list refresh; repeated calls coalesce into one."""
+        self._refresh_timer.start()
+
+    @Slot()
+    def _do_refresh(self):
         """Refreshes the prompt lists in ConfigDock based on SettingsService."""
         logger.debug("PromptActionHandler: Updating ConfigDock prompt lists...")
-        all_prompts = self._settings_service.get_setting('prompts', []) # Get from settings
+        all_prompts = self._settings_service.get_setting('user_prompts', []) # Get from settings
         selected_ids = self._settings_service.get_setting('selected_prompt_ids', [])
-        self._config_dock.populate_available_prompts(all_prompts)
-        self._config_dock.populate_selected_prompts(selected_ids, all_prompts)
+        prompts_hash = hash(tuple((p.get('id'), p.get('name'), p.get('content')) for p in all_prompts))
+        selected_hash = hash(tuple(selected_ids))
+        prompts_dirty = prompts_hash != self._last_prompts_hash
+        if not prompts_dirty and selected_hash == self._last_selected_hash:
+            logger.trace("PromptActionHandler: Prompt lists unchanged, skipping repopulation.")
+            return
+        # Dock-level signals (e.g. selected_prompts_changed) must not echo back while rebuilding
+        was_blocked = self._config_dock.blockSignals(True)
+        try:
+            if prompts_dirty:
+                self._config_dock.populate_available_prompts(all_prompts)
+            # Selected list depends on both; resolve it through the service's cached id index
+            self._config_dock.populate_selected_prompts_indexed(
+                selected_ids, self._settings_service.get_prompts_by_ids(selected_ids)
+            )
+        finally:
+            self._config_dock.blockSignals(was_blocked)
+        self._last_prompts_hash = prompts_hash
+        self._last_selected_hash = selected_hash
 
@@ -1,17 +1,44 @@
 # pm/handlers/settings_action_handler.py
-from PySide6.QtCore import QObject, Signal, Slot
+from PySide6.QtCore import QObject, Signal, Slot, Qt, QTimer, QThread
 from PySide6.QtWidgets import QMainWindow
 from PySide6.QtGui import QAction, QFont
 from loguru import logger
-from typing import Optional
-import qdarktheme # For applying theme
+from typing import Optional, Dict, Tuple, Set
+from functools import lru_cache
 
 # --- Updated Imports ---
 from ..core.app_core import AppCore
 from ..core.settings_service import SettingsService
 from ..core.model_list_service import ModelListService
 from ..core.workspace_manager import WorkspaceManager
-from ..ui.settings_dialog import SettingsDialog
+
+APPLY_DEBOUNCE_MS = 50 # Bursts of theme/font/syntax changes collapse into one apply
+
+@lru_cache(maxsize=8)
+def _load_stylesheet_cached(theme_name: str) -> str:
+    """qdarktheme builds the QSS from a template on every call; build it once per theme."""
+    import qdarktheme # Deferred: only needed once a theme is applied
+    return qdarktheme.load_stylesheet(theme_name)
+
+class StylesheetWorker(QObject):
+    """Worker object to generate a theme stylesheet in a background thread."""
+    stylesheet_ready = Signal(str, str) # theme key, stylesheet
+    error_occurred = Signal(str, str) # theme key, error message
+    finished = Signal(str) # theme key
+
+    def __init__(self, theme_key: str):
+        super().__init__()
+        self.theme_key = theme_key
+
+    @Slot()
+    def run(self):
+        """Builds the QSS string (fills the shared cache); applying it stays on the GUI thread."""
+        try:
+            self.stylesheet_ready.emit(self.theme_key, _load_stylesheet_cached(self.theme_key))
+        except Exception as e:
+            self.error_occurred.emit(self.theme_key, str(e))
+        finally:
+            self.finished.emit(self.theme_key)
 
 class SettingsActionHandler(QObject):
     """Handles opening the settings dialog and applying global settings changes."""
@@ -30,15 +57,31 @@ class SettingsActionHandler(QObject):
         self._settings_service: SettingsService = core.settings
         self._model_list_service: ModelListService = core.models
         self._workspace_manager: WorkspaceManager = core.workspace
+        # Last values pushed to the UI per setting group; identical re-applies are skipped
+        self._last_applied: Dict[str, Tuple] = {}
+        self._applied_stylesheet_hash: Optional[int] = None
+        self._settings_dialog = None # Created on first open, then reused
+        # Theme stylesheets are generated off the GUI thread the first time each is used
+        self._generated_themes: Set[str] = set()
+        self._requested_theme_key: Optional[str] = None # Latest wins; older results are dropped
+        self._stylesheet_threads: Dict[str, Tuple[QThread, StylesheetWorker]] = {}
 
         # --- Connect the menu action trigger ---
         open_settings_action.triggered.connect(self.handle_open_settings)
 
-        # --- Connect signals from SettingsService to apply changes immediately ---
+        # --- Trailing-edge debounce per channel: only the latest value is applied ---
+        self._pending_theme: Optional[str] = None
+        self._pending_font: Optional[Tuple[str, int]] = None
+        self._pending_syntax_style: Optional[str] = None
+        self._theme_timer = self._create_debounce_timer(self._flush_theme)
+        self._font_timer = self._create_debounce_timer(self._flush_font)
+        self._syntax_timer = self._create_debounce_timer(self._flush_syntax_style)
+
+        # --- Connect signals from SettingsService to (debounced) apply slots ---
         # These apply *global* settings (theme, font, syntax style)
-        self._settings_service.theme_changed.connect(self._apply_theme)
-        self._settings_service.font_changed.connect(self._apply_font)
-        self._settings_service.syntax_style_changed.connect(self._apply_syntax_style)
+        self._settings_service.theme_changed.connect(self._on_theme_changed)
+        self._settings_service.font_changed.connect(self._on_font_changed)
+        self._settings_service.syntax_style_changed.connect(self._on_syntax_style_changed)
 
         logger.info("SettingsActionHandler initialized.")
         # Apply initial theme/font settings (could be moved to MainWindow post-init)
@@ -46,87 +89,200 @@ class SettingsActionHandler(QObject):
 
     @Slot()
     def handle_open_settings(self):
-        """Opens the SettingsDialog and connects necessary signals for its duration."""
+        """Opens the SettingsDialog, creating and wiring it on first use only."""
         logger.debug("SettingsActionHandler: Opening settings dialog...")
-        # --- Pass only SettingsService ---
+        # One snapshot of all settings instead of a service call per widget
+        initial_values = self._settings_service.get_all_settings()
+        if self._settings_dialog is None:
+            self._settings_dialog = self._create_settings_dialog(initial_values)
+        else:
+            self._settings_dialog.reset_from_settings(initial_values)
+        dialog = self._settings_dialog
+
+        if dialog.exec():
+            logger.info("SettingsDialog accepted. Settings were saved by the dialog via SettingsService.")
+            # The dialog batched its changes: one signal per changed setting group, triggering updates
+        else:
+            logger.info("SettingsDialog cancelled. No settings were saved.")
+
+    def _create_settings_dialog(self, initial_values: Dict):
+        """Builds the dialog and connects it once; the connections live as long as the dialog."""
+        from ..ui.settings_dialog import SettingsDialog # Deferred: not needed during startup
         dialog = SettingsDialog(
             settings_service=self._settings_service,
-            parent=self._main_window
+            parent=self._main_window,
+            initial_values=initial_values
         )
 
         # --- Connect signals between Dialog and ModelListService ---
-        # *** Use lambdas to insert the correct provider_type ***
-        dialog.request_llm_refresh.connect(
-            lambda provider, api_key: self._model_list_service.refresh_models('llm', provider, api_key)
-        )
-        dialog.request_summarizer_refresh.connect(
-            lambda provider, api_key: self._model_list_service.refresh_models('summarizer', provider, api_key)
-        )
-        # **********************************************************
+        # Dedicated slots insert the correct provider_type (no lambdas)
+        dialog.request_llm_refresh.connect(self._on_llm_refresh)
+        dialog.request_summarizer_refresh.connect(self._on_summarizer_refresh)
 
-        # Connect ModelListService signals back to *temporary* dialog slots if dialog needs updates
+        # Connect ModelListService signals back to dialog slots if dialog needs updates
         # NOTE: SettingsDialog _populate_* slots are currently empty. Connections are harmless but redundant.
-        self._model_list_service.llm_models_updated.connect(dialog._populate_llm_model_select)
-        self._model_list_service.summarizer_models_updated.connect(dialog._populate_summarizer_model_select)
-        self._model_list_service.model_refresh_error.connect(dialog._handle_refresh_error)
+        self._model_list_service.llm_models_updated.connect(dialog._populate_llm_model_select, Qt.ConnectionType.UniqueConnection)
+        self._model_list_service.summarizer_models_updated.connect(dialog._populate_summarizer_model_select, Qt.ConnectionType.UniqueConnection)
+        self._model_list_service.model_refresh_error.connect(dialog._handle_refresh_error, Qt.ConnectionType.UniqueConnection)
         # --- End Dialog/Service Connections ---
+        return dialog
 
-        if dialog.exec():
-            logger.info("SettingsDialog accepted. Settings were saved by the dialog via SettingsService.")
-            # SettingsService will emit signals for changed settings, triggering updates
-        else:
-            logger.info("SettingsDialog cancelled. No settings were saved.")
+    @Slot(str, str)
+    def _on_llm_refresh(self, provider: str, api_key: str):
+        self._model_list_service.refresh_models('llm', provider, api_key)
 
-        # --- Disconnect signals after dialog closes ---
-        try:
-            # Disconnect using the same lambda pattern or by reference if possible (less reliable with lambdas)
-            # Trying disconnection by reference first, might fail silently for lambdas.
-            # A more robust way involves storing the lambda connection results, but let's try this first.
-            dialog.request_llm_refresh.disconnect()
-            dialog.request_summarizer_refresh.disconnect()
-            self._model_list_service.llm_models_updated.disconnect(dialog._populate_llm_model_select)
-            self._model_list_service.summarizer_models_updated.disconnect(dialog._populate_summarizer_model_select)
-            self._model_list_service.model_refresh_error.disconnect(dialog._handle_refresh_error)
-            logger.debug("SettingsActionHandler: Disconnected dialog signals (attempted).")
-        except RuntimeError as e:
-            # This might catch errors if the connection (e.g., lambda) doesn't exist or was already gone.
-            logger.warning(f"SettingsActionHandler: Error disconnecting dialog signals: {e}")
-        except Exception as e:
-             logger.exception(f"SettingsActionHandler: Unexpected error disconnecting signals: {e}")
-        # --- End Disconnect ---
+    @Slot(str, str)
+    def _on_summarizer_refresh(self, provider: str, api_key: str):
+        self._model_list_service.refresh_models('summarizer', provider, api_key)
+
+    # --- Debounced Change Handlers ---
+    def _create_debounce_timer(self, callback) -> QTimer:
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(APPLY_DEBOUNCE_MS)
+        timer.timeout.connect(callback)
+        return timer
+
+    @Slot(str)
+    def _on_theme_changed(self, theme_name: str):
+        self._pending_theme = theme_name
+        self._theme_timer.start()
+
+    @Slot(str, int)
+    def _on_font_changed(self, font_family: str, font_size: int):
+        self._pending_font = (font_family, font_size)
+        self._font_timer.start()
+
+    @Slot(str)
+    def _on_syntax_style_changed(self, style_name: str):
+        self._pending_syntax_style = style_name
+        self._syntax_timer.start()
+
+    @Slot()
+    def _flush_theme(self):
+        if self._pending_theme is not None:
+            self._apply_theme(self._pending_theme)
+
+    @Slot()
+    def _flush_font(self):
+        if self._pending_font is not None:
+            self._apply_font(*self._pending_font)
+
+    @Slot()
+    def _flush_syntax_style(self):
+        if self._pending_syntax_style is not None:
+            self._apply_syntax_style(self._pending_syntax_style)
 
     # This method can be called by MainWindow after initialization
     def apply_initial_settings(self):
         """Applies theme and font settings when the application starts."""
         logger.debug("SettingsActionHandler: Applying initial theme, font, style...")
-        self._apply_theme(self._settings_service.get_setting('theme', 'Dark'))
-        self._apply_font(
-            self._settings_service.get_setting('editor_font', 'Fira Code'),
-            self._settings_service.get_setting('editor_font_size', 11)
+        values = self._settings_service.get_settings_bulk(
+            ['theme', 'editor_font', 'editor_font_size', 'syntax_highlighting_style'],
+            {'theme': 'Dark', 'editor_font': 'Fira Code', 'editor_font_size': 11}
         )
-        self._apply_syntax_style(self._settings_service.get_setting('syntax_highlighting_style'))
+        self._apply_theme(values['theme'], blocking=True) # Avoid a first frame without the theme
+        self._apply_font(values['editor_font'], values['editor_font_size'])
+        self._apply_syntax_style(values['syntax_highlighting_style'])
+
+    def _is_already_applied(self, group: str, value: Tuple) -> bool:
+        """Records `value` for `group`; returns True if it matches what was last applied."""
+        if self._last_applied.get(group) == value:
+            logger.trace("Skipping re-apply of {} (unchanged).", group)
+            return True
+        self._last_applied[group] = value
+        return False
 
     # Slots to apply settings remain largely the same
     @Slot(str)
-    def _apply_theme(self, theme_name: str):
-        """Applies the selected UI theme (Dark/Light)."""
+    def _apply_theme(self, theme_name: str, blocking: bool = False):
+        """Applies the selected UI theme (Dark/Light), generating its QSS in the background if new."""
+        if self._is_already_applied('theme', (theme_name,)):
+            return
         logger.info(f"Applying theme: {theme_name}")
+        theme_key = theme_name.lower()
+        self._requested_theme_key = theme_key
+        if not blocking and theme_key not in self._generated_themes:
+            self._start_stylesheet_worker(theme_key)
+            return
         try:
-            stylesheet = qdarktheme.load_stylesheet(theme_name.lower())
-            self._main_window.setStyleSheet(stylesheet) # Apply to main window
-            # Potentially re-apply to dialogs if they don't inherit? Usually they do.
+            stylesheet = _load_stylesheet_cached(theme_key) # Cache hit unless blocking on a new theme
+            self._generated_themes.add(theme_key) # Later non-blocking applies skip the worker
+            self._set_stylesheet(stylesheet)
         except Exception as e:
+            self._last_applied.pop('theme', None) # Allow a retry with the same name
             logger.error(f"Failed to apply theme '{theme_name}': {e}")
 
+    def _start_stylesheet_worker(self, theme_key: str):
+        if theme_key in self._stylesheet_threads:
+            return # Already generating; the result is applied if still requested
+        thread = QThread(self) # Parented: Qt owns it even if our reference is dropped
+        thread.setObjectName(f"StylesheetThread_{theme_key}")
+        worker = StylesheetWorker(theme_key)
+        self._stylesheet_threads[theme_key] = (thread, worker)
+        worker.moveToThread(thread)
+
+        worker.stylesheet_ready.connect(self._on_stylesheet_ready)
+        worker.error_occurred.connect(self._on_stylesheet_error)
+        thread.started.connect(worker.run)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.finished.connect(lambda key=theme_key: self._stylesheet_threads.pop(key, None))
+        thread.start()
+        logger.debug(f"SettingsActionHandler: Generating stylesheet for '{theme_key}' ({thread.objectName()}).")
+
+    def stop_stylesheet_workers(self, timeout_ms: int = 2000):
+        """Quits and waits for stylesheet generation threads (e.g. on window close)."""
+        for theme_key, (thread, _worker) in list(self._stylesheet_threads.items()):
+            try:
+                if thread.isRunning():
+                    thread.quit()
+                    if not thread.wait(timeout_ms):
+                        logger.warning(f"SettingsActionHandler: {thread.objectName()} did not finish in {timeout_ms} ms.")
+            except RuntimeError: # Already deleted by deleteLater
+                pass
+            self._stylesheet_threads.pop(theme_key, None)
+
+    @Slot(str, str)
+    def _on_stylesheet_ready(self, theme_key: str, stylesheet: str):
+        self._generated_themes.add(theme_key)
+        if theme_key != self._requested_theme_key:
+            logger.debug(f"Stylesheet for '{theme_key}' superseded by '{self._requested_theme_key}', not applying.")
+            return
+        self._set_stylesheet(stylesheet)
+
+    @Slot(str, str)
+    def _on_stylesheet_error(self, theme_key: str, error_message: str):
+        if theme_key == self._requested_theme_key:
+            self._last_applied.pop('theme', None) # Allow a retry with the same name
+        logger.error(f"Failed to apply theme '{theme_key}': {error_message}")
+
+    def _set_stylesheet(self, stylesheet: str):
+        """Applies QSS to the main window (GUI thread only)."""
+        # Same QSS (e.g. theme names differing only in case): skip the full re-polish.
+        # Hash of the cached string is memoized by Python; no styleSheet() round-trip.
+        stylesheet_hash = hash(stylesheet)
+        if stylesheet_hash == self._applied_stylesheet_hash:
+            logger.debug("Theme stylesheet unchanged, skipping setStyleSheet.")
+            return
+        self._main_window.setStyleSheet(stylesheet) # Apply to main window
+        self._applied_stylesheet_hash = stylesheet_hash
+        # Potentially re-apply to dialogs if they don't inherit? Usually they do.
+
     @Slot(str, int)
     def _apply_font(self, font_family: str, font_size: int):
         """Applies font changes to relevant widgets via WorkspaceManager."""
+        if self._is_already_applied('font', (font_family, font_size)):
+            return
         logger.info(f"Applying font: {font_family}, Size: {font_size}")
         self._workspace_manager.apply_font_to_editors(font_family, font_size)
 
     @Slot(str)
     def _apply_syntax_style(self, style_name: str):
         """Applies the selected syntax highlighting style via WorkspaceManager."""
+        if self._is_already_applied('syntax_style', (style_name,)):
+            return
         logger.info(f"Applying syntax style: {style_name}")
         self._workspace_manager.apply_syntax_style(style_name)
 
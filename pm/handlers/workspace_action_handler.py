@@ -6,16 +6,19 @@ from PySide6.QtWidgets import ( QMainWindow, QTreeWidget, QTreeWidgetItem, QTabW
 from PySide6.QtGui import QAction # Keep QAction for type hint if actions passed
 from loguru import logger
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict
 
 # --- Updated Imports ---
 from ..core.app_core import AppCore
 from ..core.workspace_manager import WorkspaceManager
 from ..core.settings_service import SettingsService
+from ..core.constants import IS_DIR_ROLE, PATH_ROLE
 from ..ui.controllers.status_bar_controller import StatusBarController
 from ..core.action_manager import ActionManager # If passing ActionManager
 from ..ui.main_window_ui import MainWindowUI # If passing UIManager
 
+UI_UPDATE_DEBOUNCE_MS = 40 # Trailing delay collapsing modification/tab/editor signal bursts
+
 class WorkspaceActionHandler(QObject):
     """Handles file/project actions triggered by menus, toolbar, or file tree."""
 
@@ -45,6 +48,18 @@ class WorkspaceActionHandler(QObject):
         self._file_tree: QTreeWidget = ui.file_tree
         self._tab_widget: QTabWidget = ui.tab_widget
         self._save_file_action: QAction = actions.save_action # Get specific action
+        # Whether each tab title currently carries the '*' marker; title work only on transitions
+        self._tab_dirty_marker: Dict[QPlainTextEdit, bool] = {}
+        # Current tab, tracked from currentChanged so keystroke-driven updates skip the lookups
+        self._current_editor = None
+        self._current_editor_index: int = -1
+        self._connected_doc = None # Document whose modificationChanged is connected
+        # Bursts of modificationChanged/editors_changed (typing, undo, open/close/save)
+        # collapse into one UI-state update once they settle
+        self._ui_update_timer = QTimer(self)
+        self._ui_update_timer.setSingleShot(True)
+        self._ui_update_timer.setInterval(UI_UPDATE_DEBOUNCE_MS)
+        self._ui_update_timer.timeout.connect(self._update_ui_states)
 
         # --- Connect Menu Actions (from ActionManager) ---
         actions.new_file.triggered.connect(self.handle_new_file)
@@ -55,21 +70,21 @@ class WorkspaceActionHandler(QObject):
         # --- Connect File Tree Signals ---
         self._file_tree.itemDoubleClicked.connect(self.handle_tree_item_activated)
         # itemChanged connection is handled HERE now for check state logic
-        self._file_tree.itemChanged.connect(self.handle_tree_item_changed)
+        # Unique: a second connection would run the whole subtree propagation twice per toggle
+        self._file_tree.itemChanged.connect(self.handle_tree_item_changed, Qt.ConnectionType.UniqueConnection)
 
         # --- Connect Tab Widget Signals ---
         self._tab_widget.tabCloseRequested.connect(self.handle_close_tab_request)
-        self._tab_widget.currentChanged.connect(self.handle_tab_changed) # Update save button state
-        # Connect document modification signal to update UI state
-        self._tab_widget.currentChanged.connect(self._connect_current_editor_signals) # Connect on tab change
-        # Also connect for the initial widget if any
+        # handle_tab_changed also (re)connects the editor's modification signal: one slot per switch
+        self._tab_widget.currentChanged.connect(self.handle_tab_changed)
+        # Connect for the initial widget if any
         self._connect_current_editor_signals()
 
         # --- Connect WorkspaceManager Signals ---
         self._workspace_manager.project_changed.connect(self._on_project_changed)
         self._workspace_manager.file_saved.connect(self._on_file_saved)
         self._workspace_manager.file_operation_error.connect(self._on_file_op_error)
-        self._workspace_manager.editors_changed.connect(self._update_ui_states) # Update save button
+        self._workspace_manager.editors_changed.connect(self._schedule_ui_update) # Update save button
 
         # --- Initial State ---
         self._update_ui_states()
@@ -78,15 +93,25 @@ class WorkspaceActionHandler(QObject):
     # --- Slot to connect editor signals ---
     @Slot()
     def _connect_current_editor_signals(self):
-        """Connects modificationChanged signal for the currently active editor."""
+        """Connects modificationChanged for the active editor only, dropping the previous editor's."""
         current_editor = self._tab_widget.currentWidget()
-        if isinstance(current_editor, QPlainTextEdit) and hasattr(current_editor, 'document'):
-             # Disconnect previous connections if any (optional, but safer)
-             # try: current_editor.document().modificationChanged.disconnect(self._update_ui_states)
-             # except RuntimeError: pass
-             # Connect the signal
-             current_editor.document().modificationChanged.connect(self._update_ui_states)
-             logger.debug(f"Connected modificationChanged for editor: {current_editor.objectName()}")
+        document = current_editor.document() if getattr(current_editor, '_gs_is_editor', False) else None
+        if document is self._connected_doc:
+            return # Same editor (e.g. currentChanged plus an explicit call)
+        if self._connected_doc is not None:
+            # Otherwise every visited editor stays connected and each edit fans in N updates
+            try:
+                self._connected_doc.modificationChanged.disconnect(self._schedule_ui_update)
+            except (TypeError, RuntimeError, SystemError): # Already gone (tab closed)
+                pass
+        self._connected_doc = document
+        if document is not None:
+             # Debounced: the UI-state update runs after typing/undo toggles settle, not inside the keystroke.
+             try:
+                 document.modificationChanged.connect(self._schedule_ui_update, Qt.ConnectionType.UniqueConnection)
+             except (TypeError, RuntimeError, SystemError): # Already connected
+                 pass
+             logger.debug("Connected modificationChanged for editor: {}", current_editor.objectName())
 
     # --- Action Handlers (Slots) ---
     @Slot(QModelIndex)
@@ -96,13 +121,8 @@ class WorkspaceActionHandler(QObject):
         if not index.isValid(): return
         item = self._file_tree.itemFromIndex(index)
         if not item: return
-        if index.column() == 0:
-            path_str = item.data(0, Qt.ItemDataRole.UserRole)
-            if path_str:
-                try:
-                    path = Path(path_str)
-                    if path.is_dir(): item.setExpanded(not item.isExpanded())
-                except Exception as e: logger.warning(f"Error processing click: {e}")
+        if index.column() == 0 and item.data(0, IS_DIR_ROLE):
+            item.setExpanded(not item.isExpanded())
 
     @Slot()
     def handle_new_file(self):
@@ -124,11 +144,12 @@ class WorkspaceActionHandler(QObject):
     @Slot()
     def handle_open_project(self):
         """Handles the 'Open Project Folder' action."""
-        current_dir = str(self._workspace_manager.project_path or Path.home())
+        current_dir = self._workspace_manager.project_path_str or str(Path.home())
         new_dir = QFileDialog.getExistingDirectory(self._main_window, "Open Project Folder", current_dir)
         if new_dir:
             new_path = Path(new_dir)
-            if not self.close_all_tabs(): return # User cancelled closing
+            if not self.close_all_tabs():
+                return # User cancelled closing
             # Setting project path in WorkspaceManager triggers project_changed signal
             # SettingsService load is handled by MainWindow listening to workspace_manager.project_changed
             self._workspace_manager.set_project_path(new_path)
@@ -138,11 +159,12 @@ class WorkspaceActionHandler(QObject):
     def handle_save_active_file(self):
         """Handles the 'Save File' action for the currently active tab."""
         current_editor = self._tab_widget.currentWidget()
-        if current_editor and isinstance(current_editor, QPlainTextEdit) and hasattr(current_editor, 'objectName') and current_editor.objectName():
+        if getattr(current_editor, '_gs_is_editor', False): # Tagged by load_file: QPlainTextEdit with a path objectName
             if current_editor.document().isModified():
-                 saved = self._workspace_manager.save_tab_content(current_editor)
+                 # Written off the GUI thread; the tab stays dirty until the write succeeds
+                 saved = self._workspace_manager.save_tab_content_async(current_editor)
                  # _on_file_saved will show status message via status bar controller
-                 # UI state update happens in _on_file_saved -> _update_ui_states
+                 # UI state update happens in _on_file_saved -> _schedule_ui_update
             else:
                  logger.debug("Save action triggered, but file not modified.")
                  self._status_bar.update_status("File not modified.", 2000) # Use status bar
@@ -153,19 +175,18 @@ class WorkspaceActionHandler(QObject):
     @Slot(QTreeWidgetItem, int)
     def handle_tree_item_activated(self, item: QTreeWidgetItem, column: int):
         """Handles double-clicking or activating an item in the file tree."""
-        path_str = item.data(0, Qt.ItemDataRole.UserRole)
-        if path_str:
-            path = Path(path_str)
-            if path.is_file():
-                logger.debug(f"Tree item activated: Loading file {path.name}")
-                editor = self._workspace_manager.load_file(path, self._tab_widget)
-                if editor: self._connect_current_editor_signals() # Connect signals
+        path = item.data(0, PATH_ROLE) # Path stored at population, no re-parse of the string
+        if isinstance(path, Path) and not item.data(0, IS_DIR_ROLE):
+            # load_file does the single is_file() check (and reports files removed since the scan)
+            logger.debug(f"Tree item activated: Loading file {path.name}")
+            editor = self._workspace_manager.load_file(path, self._tab_widget)
+            if editor: self._connect_current_editor_signals() # Connect signals
 
     @Slot(int)
     def handle_close_tab_request(self, index: int):
         """Handles the request to close a tab (e.g., clicking the 'x' button)."""
         widget_to_close = self._tab_widget.widget(index)
-        if widget_to_close and isinstance(widget_to_close, QPlainTextEdit) and hasattr(widget_to_close, 'document') and widget_to_close.document().isModified():
+        if getattr(widget_to_close, '_gs_is_editor', False) and widget_to_close.document().isModified():
             reply = QMessageBox.question(
                 self._main_window, "Unsaved Changes",
                 f"Save changes to '{self._tab_widget.tabText(index).replace('*','')}' before closing?",
@@ -178,11 +199,13 @@ class WorkspaceActionHandler(QObject):
                     self._on_file_op_error(f"Failed to save {self._tab_widget.tabText(index)} on close.")
                     return # Don't close if save failed
         logger.info(f"Closing tab at index {index}")
+        self._tab_dirty_marker.pop(widget_to_close, None)
         self._workspace_manager.close_tab(index, self._tab_widget)
 
     @Slot(int)
     def handle_tab_changed(self, index: int):
          """Handles switching between tabs."""
+         self._track_current_editor()
          self._connect_current_editor_signals() # Connect signals for the newly focused editor
          self._update_ui_states() # Update save button enable state
 
@@ -192,16 +215,17 @@ class WorkspaceActionHandler(QObject):
         """Updates UI elements when the project path changes."""
         # MainWindow handles title, SettingsService load. This handler updates tree & closes tabs.
         logger.info(f"WorkspaceActionHandler: Project changed to {new_project_path}. Refreshing tree.")
-        self._workspace_manager.populate_file_tree(self._file_tree)
+        # Walk + token counting run off the GUI thread; a recent project's unchanged tree is reused
+        self._workspace_manager.populate_file_tree(self._file_tree, force=False, background=True)
         self.close_all_tabs(confirm=False) # Force close without confirmation now
-        self._update_ui_states()
+        self._schedule_ui_update() # Coalesces with close_all_tabs' editors_changed
         self._status_bar.update_status(f"Opened project: {new_project_path.name}", 3000) # Use status bar
 
     @Slot(Path)
     def _on_file_saved(self, file_path: Path):
         """Shows status message and updates UI state when file is saved."""
         self._status_bar.update_status(f"Saved: {file_path.name}", 2000) # Use status bar
-        self._update_ui_states() # Update tab title and save button state
+        self._schedule_ui_update() # Tab title and save button state, coalesced with editors_changed
 
     @Slot(str)
     def _on_file_op_error(self, error_message: str):
@@ -215,60 +239,89 @@ class WorkspaceActionHandler(QObject):
     @Slot(bool) # Can be called by modificationChanged(bool) or directly
     def _update_ui_states(self, modified_state: Optional[bool] = None):
         """Updates the enabled state of actions and tab titles based on current context."""
-        active_widget = self._tab_widget.currentWidget()
-        has_active_editor = isinstance(active_widget, QPlainTextEdit)
+        idx = self._current_editor_index
+        # Tracked tab may be stale (tabs closed/moved with signals blocked): one O(1) check
+        if not (0 <= idx < self._tab_widget.count()) or self._tab_widget.widget(idx) is not self._current_editor:
+            self._track_current_editor()
+            idx = self._current_editor_index
+        active_widget = self._current_editor
+        has_active_editor = getattr(active_widget, '_gs_is_editor', False)
         is_dirty = False
-        if has_active_editor and hasattr(active_widget, 'document'):
-             is_dirty = active_widget.document().isModified() if modified_state is None else modified_state
+        if has_active_editor:
+             # Read the document itself: a queued modificationChanged may come from the previous tab
+             is_dirty = active_widget.document().isModified()
+
+        save_enabled = has_active_editor and is_dirty
+        marker_matches = not has_active_editor or self._tab_dirty_marker.get(active_widget, False) == is_dirty
+        if marker_matches and self._save_file_action.isEnabled() == save_enabled:
+            return # Title and Save action already reflect this state
 
         # Update Save action state using the stored action
-        self._save_file_action.setEnabled(has_active_editor and is_dirty)
+        self._save_file_action.setEnabled(save_enabled)
+
+        # Update tab title with dirty indicator '*' (only on a marker transition; no text scan)
+        if not marker_matches and idx != -1:
+             tab_text = self._tab_widget.tabText(idx)
+             new_text = tab_text + '*' if is_dirty else tab_text[:-1]
+             # Title change relayouts the tab bar: let it repaint once afterwards,
+             # without notifying tab-bar listeners about the relayout
+             tab_bar = self._tab_widget.tabBar()
+             tab_bar.setUpdatesEnabled(False)
+             tab_bar.blockSignals(True)
+             try:
+                 self._tab_widget.setTabText(idx, new_text)
+             finally:
+                 tab_bar.blockSignals(False)
+                 tab_bar.setUpdatesEnabled(True)
+             self._tab_dirty_marker[active_widget] = is_dirty
 
-        # Update tab title with dirty indicator '*'
-        if has_active_editor:
-             idx = self._tab_widget.indexOf(active_widget)
-             if idx != -1:
-                  tab_text = self._tab_widget.tabText(idx)
-                  has_asterisk = tab_text.endswith('*')
-                  if is_dirty and not has_asterisk: self._tab_widget.setTabText(idx, tab_text + '*')
-                  elif not is_dirty and has_asterisk: self._tab_widget.setTabText(idx, tab_text[:-1])
+    @Slot()
+    @Slot(bool) # modificationChanged(bool); the state is re-read from the document when the timer fires
+    def _schedule_ui_update(self, modified_state: Optional[bool] = None):
+        self._ui_update_timer.start() # Restarts while a burst continues (trailing debounce)
 
     # --- Helper Methods ---
+    def _track_current_editor(self):
+        self._current_editor = self._tab_widget.currentWidget()
+        self._current_editor_index = self._tab_widget.currentIndex()
+
     def close_all_tabs(self, confirm: bool = True) -> bool:
          """Closes all open editor tabs, optionally confirming for unsaved changes."""
+         if self._tab_widget.count() == 0 and not self._workspace_manager.open_editors:
+              return True # Nothing open (e.g. first project open): no scan, dialog or editors_changed
          # (Logic remains the same, using self._main_window for dialog parent)
          logger.debug(f"Attempting to close all tabs (Confirm: {confirm})...")
+         # Ask the documents themselves: any tab may have been edited since the last UI pass
          unsaved_files = []
-         indices_to_check = list(range(self._tab_widget.count()))
-         for i in indices_to_check:
+         for i in range(self._tab_widget.count()):
               widget = self._tab_widget.widget(i)
-              if widget and isinstance(widget, QPlainTextEdit) and hasattr(widget, 'document') and widget.document().isModified():
-                   tab_text = self._tab_widget.tabText(i).replace('*','')
-                   unsaved_files.append(tab_text)
+              if getattr(widget, '_gs_is_editor', False) and widget.document().isModified():
+                   unsaved_files.append(self._tab_widget.tabText(i).replace('*',''))
          if unsaved_files and confirm:
               reply = QMessageBox.warning(
                    self._main_window, "Unsaved Changes",
                    "The following files have unsaved changes:\n- " + "\n- ".join(unsaved_files) + "\n\nClose anyway?",
                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.Cancel, QMessageBox.StandardButton.Cancel)
-              if reply == QMessageBox.StandardButton.Cancel: logger.info("User cancelled closing tabs."); return False
-         while self._tab_widget.count() > 0:
-              idx_to_close = self._tab_widget.count() - 1; widget_to_close = self._tab_widget.widget(idx_to_close)
-              if widget_to_close:
-                  if isinstance(widget_to_close, QPlainTextEdit) and hasattr(widget_to_close, 'document'):
-                       try: widget_to_close.document().modificationChanged.disconnect(self._update_ui_states)
-                       except RuntimeError: pass
-                  self._workspace_manager.close_tab(idx_to_close, self._tab_widget)
-              else: self._tab_widget.removeTab(idx_to_close)
-         if self._workspace_manager.open_editors:
-              logger.warning(f"open_editors dict not empty: {list(self._workspace_manager.open_editors.keys())}")
-              self._workspace_manager.open_editors.clear(); self._workspace_manager.editors_changed.emit()
+              if reply == QMessageBox.StandardButton.Cancel:
+                   logger.info("User cancelled closing tabs.")
+                   return False
+         if self._connected_doc is not None: # Only the active editor's document is connected
+              try:
+                  self._connected_doc.modificationChanged.disconnect(self._schedule_ui_update)
+              except (RuntimeError, TypeError, SystemError):
+                  pass
+         self._tab_dirty_marker.clear()
+         self._connected_doc = None
+         # Bulk tear-down: one editors_changed (-> scheduled UI update) instead of one per tab
+         self._workspace_manager.close_all_tabs(self._tab_widget)
          return True
 
     # --- Recursive Check Handling ---
     @Slot(QTreeWidgetItem, int)
     def handle_tree_item_changed(self, item: QTreeWidgetItem, column: int):
         """Handles check state changes for recursive updates and status bar."""
-        if column != 0 or not item: return
+        if column != 0 or not item:
+            return
 
         # --- Update Status Bar ---
         # This is called frequently, debounce might be needed if performance issues arise
@@ -276,29 +329,44 @@ class WorkspaceActionHandler(QObject):
         # self._status_bar.update_token_count(...) # Needs calculation logic moved here or signal
 
         # --- Handle Recursive Directory Check ---
-        path_str = item.data(0, Qt.ItemDataRole.UserRole)
-        if not path_str or not Path(path_str).is_dir(): return # Only dirs trigger recursion
+        if not item.data(0, IS_DIR_ROLE):
+            return # Only dirs trigger recursion
 
         new_state = item.checkState(0)
         logger.debug(f"Directory '{item.text(0)}' changed state to {new_state}. Updating children...")
         tree = item.treeWidget()
-        if not tree: return
+        if not tree:
+            return
         try:
             tree.blockSignals(True)
+            # The view repaints the whole subtree once when updates are re-enabled
+            tree.setUpdatesEnabled(False)
             self._set_child_check_state(item, new_state)
         finally:
+            tree.setUpdatesEnabled(True)
             tree.blockSignals(False)
             # Trigger status update after recursive changes are done
             # MainWindow still handles enforcement
 
     def _set_child_check_state(self, parent_item: QTreeWidgetItem, state: Qt.CheckState):
-        """Recursively sets the check state for all children."""
-        # (Logic remains the same)
-        for i in range(parent_item.childCount()):
-            child_item = parent_item.child(i)
-            if bool(child_item.flags() & Qt.ItemFlag.ItemIsUserCheckable):
-                child_item.setCheckState(0, state)
-                child_path_str = child_item.data(0, Qt.ItemDataRole.UserRole)
-                if child_path_str and Path(child_path_str).is_dir():
-                    self._set_child_check_state(child_item, state)
+        """Sets the check state for all descendants."""
+        # Flat list precomputed at tree population: one loop, no per-level childCount()/child() walk
+        descendants = self._workspace_manager.checkable_descendants(parent_item.data(0, Qt.ItemDataRole.UserRole))
+        if descendants is not None:
+            for child_item in descendants:
+                if child_item.checkState(0) != state:
+                    child_item.setCheckState(0, state)
+            return
+        # Fallback for items not built by populate_file_tree: iterative depth-first walk
+        stack = [parent_item]
+        while stack:
+            item = stack.pop()
+            for i in range(item.childCount()):
+                child_item = item.child(i)
+                if not (child_item.flags() & Qt.ItemFlag.ItemIsUserCheckable):
+                    continue
+                if child_item.checkState(0) != state: # Skip no-op updates
+                    child_item.setCheckState(0, state)
+                if child_item.data(0, IS_DIR_ROLE):
+                    stack.append(child_item)
 
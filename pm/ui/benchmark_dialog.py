@@ -1,4 +1,5 @@
 from PySide6.QtWidgets import QDialog, QListWidget, QDialogButtonBox, QVBoxLayout, QTextEdit
+from PySide6.QtCore import Slot
 
 class BenchmarkDialog(QDialog):
     def __init__(self, models, runner):
@@ -20,6 +21,7 @@ class BenchmarkDialog(QDialog):
         self.runner = runner
         self.models = models
 
+    @Slot()
     def run(self):
         selected = [i.text() for i in self.list_widget.selectedItems()]
         text = "Enter prompt..."
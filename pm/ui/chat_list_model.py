@@ -0,0 +1,144 @@
+# pm/ui/chat_list_model.py
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+from loguru import logger
+from typing import List, Dict, Optional, Any
+
+INITIAL_ROW_COUNT = 20 # Most recent messages exposed after a reset
+OLDER_BATCH_SIZE = 20 # Messages prepended per load_older() call
+
+class ChatListModel(QAbstractListModel):
+    """List model exposing chat history messages to a QListView.
+
+    Only the most recent messages are exposed as rows after a reset; older ones
+    are held back and prepended in batches via load_older() as the user scrolls up.
+    """
+    MessageIdRole = Qt.ItemDataRole.UserRole + 1
+    RoleRole = Qt.ItemDataRole.UserRole + 2
+    ContentRole = Qt.ItemDataRole.UserRole + 3
+    TimestampRole = Qt.ItemDataRole.UserRole + 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._messages: List[Dict] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._older_messages: List[Dict] = [] # Not yet exposed as rows, oldest first
+
+    # --- QAbstractListModel Interface ---
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._messages)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or not (0 <= index.row() < len(self._messages)):
+            return None
+        message = self._messages[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole or role == self.ContentRole:
+            return message.get('content', '')
+        if role == self.MessageIdRole:
+            return message.get('id')
+        if role == self.RoleRole:
+            return message.get('role', 'unknown')
+        if role == self.TimestampRole:
+            return message.get('timestamp')
+        return None
+
+    def roleNames(self) -> Dict[int, bytes]:
+        names = super().roleNames()
+        names[self.MessageIdRole] = b'messageId'
+        names[self.RoleRole] = b'role'
+        names[self.ContentRole] = b'content'
+        names[self.TimestampRole] = b'timestamp'
+        return names
+
+    # --- Lookup ---
+    def row_for_id(self, message_id: str) -> int:
+        """Returns the row of a message ID, or -1 if not present."""
+        return self._id_to_row.get(message_id, -1)
+
+    def index_for_id(self, message_id: str) -> QModelIndex:
+        row = self.row_for_id(message_id)
+        return self.index(row, 0) if row != -1 else QModelIndex()
+
+    def message_at(self, row: int) -> Optional[Dict]:
+        if 0 <= row < len(self._messages):
+            return self._messages[row]
+        return None
+
+    def _reindex(self):
+        self._id_to_row = {m['id']: row for row, m in enumerate(self._messages)}
+
+    # --- Incremental Loading ---
+    def has_older(self) -> bool:
+        return bool(self._older_messages)
+
+    def load_older(self, count: int = OLDER_BATCH_SIZE) -> int:
+        """Prepends up to `count` held-back messages as rows. Returns the number added."""
+        count = min(count, len(self._older_messages))
+        if count <= 0:
+            return 0
+        batch = self._older_messages[-count:]
+        self.beginInsertRows(QModelIndex(), 0, count - 1)
+        del self._older_messages[-count:]
+        self._messages[0:0] = batch
+        self._reindex()
+        self.endInsertRows()
+        return count
+
+    # --- Mutation ---
+    def reset_history(self, history: List[Dict]):
+        """Replaces all rows with a history snapshot (initial load / clear only)."""
+        self.beginResetModel()
+        messages = [dict(m) for m in history if m.get('id')] # Own copies
+        split = max(0, len(messages) - INITIAL_ROW_COUNT)
+        self._older_messages = messages[:split]
+        self._messages = messages[split:]
+        self._reindex()
+        self.endResetModel()
+        logger.trace("ChatListModel: Reset with {} rows ({} older held back).", len(self._messages), len(self._older_messages))
+
+    def append_message(self, message: Dict):
+        """Appends one message as a single inserted row."""
+        if not message.get('id') or message['id'] in self._id_to_row:
+            return
+        row = len(self._messages)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._messages.append(dict(message))
+        self._id_to_row[message['id']] = row
+        self.endInsertRows()
+
+    def remove_from(self, message_id: str):
+        """Removes the message with this ID and every row after it."""
+        row = self.row_for_id(message_id)
+        if row == -1:
+            older_ids = [m['id'] for m in self._older_messages]
+            if message_id not in older_ids:
+                return
+            # Truncation starts in the held-back part: drop its tail and every row
+            del self._older_messages[older_ids.index(message_id):]
+            row = 0
+        if not self._messages:
+            return
+        self.beginRemoveRows(QModelIndex(), row, len(self._messages) - 1)
+        for message in self._messages[row:]:
+            self._id_to_row.pop(message['id'], None)
+        del self._messages[row:]
+        self.endRemoveRows()
+
+    def update_content(self, message_id: str, content: str) -> QModelIndex:
+        """Sets a message's content and notifies views for that row only.
+
+        A message still held back is updated in place, so load_older() exposes the current text.
+        Returns an invalid index in that case (no row to notify).
+        """
+        row = self.row_for_id(message_id)
+        if row == -1:
+            for message in self._older_messages:
+                if message['id'] == message_id:
+                    message['content'] = content
+                    break
+            return QModelIndex()
+        self._messages[row]['content'] = content
+        idx = self.index(row, 0)
+        self.dataChanged.emit(idx, idx, [self.ContentRole, Qt.ItemDataRole.DisplayRole])
+        return idx
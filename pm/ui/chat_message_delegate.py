@@ -0,0 +1,246 @@
+# pm/ui/chat_message_delegate.py
+import datetime
+from collections import OrderedDict
+from PySide6.QtWidgets import QStyledItemDelegate, QStyle, QStyleOptionViewItem, QApplication, QAbstractItemView
+from PySide6.QtCore import Qt, Signal, QSize, QRect, QRectF, QPoint, QEvent, QModelIndex, QUrl
+from PySide6.QtGui import (
+    QTextDocument, QAbstractTextDocumentLayout, QPalette, QColor, QFont, QFontMetrics,
+    QGuiApplication, QDesktopServices
+)
+import qtawesome as qta
+from loguru import logger
+from typing import Dict, Optional, Tuple
+
+from .chat_list_model import ChatListModel
+from .chat_message_widget import ChatMessageWidget, CONTENT_STYLESHEET, markdown_to_html
+
+# --- Layout Metrics (match ChatMessageWidget) ---
+MARGIN = 5
+SPACING = 3
+HEADER_HEIGHT = 20
+BUTTON_SIZE = 20
+BUTTON_SPACING = 5
+USER_ROLE_COLOR = "#A0A0FF"
+AI_ROLE_COLOR = "#90EE90"
+DOCUMENT_CACHE_SIZE = 200 # Laid-out documents kept for recently painted messages
+
+class ChatMessageDelegate(QStyledItemDelegate):
+    """Paints chat messages directly so only visible rows cost any rendering work."""
+    deleteRequested = Signal(str)
+    editRequested = Signal(str)
+    editSubmitted = Signal(str, str)
+    editCancelled = Signal(str)
+    copyRequested = Signal(str)
+
+    def __init__(self, parent: Optional[QAbstractItemView] = None):
+        super().__init__(parent)
+        self._icons = {
+            'copy': qta.icon('fa5s.copy'),
+            'edit': qta.icon('fa5s.edit'),
+            'delete': qta.icon('fa5s.trash-alt', color='#F44336'),
+        }
+        self._editors: Dict[str, ChatMessageWidget] = {} # message_id -> open edit widget
+        # LRU of message_id -> (content, document); content check invalidates stale entries
+        self._doc_cache: "OrderedDict[str, Tuple[str, QTextDocument]]" = OrderedDict()
+        self._uncached_message_id: Optional[str] = None # Message currently streaming
+        # Streaming row's document for its latest content only: sizeHint and paint of one flush share it
+        self._streaming_doc: Optional[Tuple[str, QTextDocument]] = None
+        self._row_heights: Dict[str, int] = {} # message_id -> height last reported by sizeHint
+
+    # --- Document Cache ---
+    def set_streaming_message(self, message_id: Optional[str]):
+        """Excludes the growing message from the cache; pass None to resume caching it."""
+        self._uncached_message_id = message_id
+        self._streaming_doc = None
+        if message_id:
+            self._doc_cache.pop(message_id, None)
+
+    def invalidate(self, message_id: Optional[str] = None):
+        """Drops cached layout for one message, or for all messages."""
+        self._streaming_doc = None
+        if message_id is None:
+            self._doc_cache.clear()
+            self._row_heights.clear()
+        else:
+            self._doc_cache.pop(message_id, None)
+            self._row_heights.pop(message_id, None)
+
+    # --- Geometry Helpers ---
+    def _available_width(self, option: QStyleOptionViewItem) -> int:
+        view = self.parent()
+        if isinstance(view, QAbstractItemView) and view.viewport():
+            return max(100, view.viewport().width())
+        return max(100, option.rect.width())
+
+    def _button_rects(self, rect: QRect, width: int, is_user: bool) -> Dict[str, QRect]:
+        names = ['copy', 'edit', 'delete'] if is_user else ['copy', 'delete']
+        rects = {}
+        x = rect.left() + width - MARGIN - BUTTON_SIZE
+        for name in reversed(names):
+            rects[name] = QRect(x, rect.top() + MARGIN, BUTTON_SIZE, BUTTON_SIZE)
+            x -= BUTTON_SIZE + BUTTON_SPACING
+        return rects
+
+    def _content_origin(self, rect: QRect) -> QPoint:
+        return QPoint(rect.left() + MARGIN, rect.top() + MARGIN + HEADER_HEIGHT + SPACING)
+
+    def _content_document(self, index: QModelIndex, text_width: int) -> QTextDocument:
+        message_id = index.data(ChatListModel.MessageIdRole)
+        content = index.data(ChatListModel.ContentRole) or ''
+        is_streaming = message_id is not None and message_id == self._uncached_message_id
+        cached = self._streaming_doc if is_streaming else self._doc_cache.get(message_id)
+        if cached and cached[0] == content:
+            if not is_streaming:
+                self._doc_cache.move_to_end(message_id)
+            doc = cached[1]
+            if doc.textWidth() != text_width:
+                doc.setTextWidth(text_width) # Re-wrap only; no markdown/HTML re-parse
+            return doc
+
+        doc = QTextDocument()
+        doc.setDefaultStyleSheet(CONTENT_STYLESHEET)
+        try:
+            doc.setHtml(markdown_to_html(content))
+        except Exception as e:
+            logger.error(f"Markdown formatting error: {e}")
+            doc.setPlainText(f"[Error formatting content]\n{content}")
+        doc.setTextWidth(text_width)
+        if is_streaming:
+            self._streaming_doc = (content, doc) # Replaced by the next flush's content
+        elif message_id:
+            self._doc_cache[message_id] = (content, doc)
+            if len(self._doc_cache) > DOCUMENT_CACHE_SIZE:
+                self._doc_cache.popitem(last=False)
+        return doc
+
+    # --- Painting ---
+    def paint(self, painter, option: QStyleOptionViewItem, index: QModelIndex):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = "" # Content is drawn below as rich text
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, opt, painter, opt.widget)
+        if index.data(ChatListModel.MessageIdRole) in self._editors:
+            return # The persistent edit widget covers this row
+
+        painter.save()
+        rect = option.rect
+        width = self._available_width(option)
+        role = index.data(ChatListModel.RoleRole) or 'unknown'
+
+        # --- Header Row ---
+        header_rect = QRect(rect.left() + MARGIN, rect.top() + MARGIN, width - 2 * MARGIN, HEADER_HEIGHT)
+        role_text = role.capitalize()
+        role_font = QFont(option.font)
+        role_font.setBold(True)
+        painter.setFont(role_font)
+        painter.setPen(QColor(USER_ROLE_COLOR if role == 'user' else AI_ROLE_COLOR))
+        painter.drawText(header_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, role_text)
+
+        timestamp = index.data(ChatListModel.TimestampRole)
+        if isinstance(timestamp, datetime.datetime):
+            ts_font = QFont(option.font)
+            ts_font.setPointSize(8)
+            painter.setFont(ts_font)
+            painter.setPen(QColor("grey"))
+            role_width = QFontMetrics(role_font).horizontalAdvance(role_text)
+            painter.drawText(header_rect.adjusted(role_width + 6, 0, 0, 0),
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, timestamp.strftime("%H:%M:%S"))
+
+        for name, button_rect in self._button_rects(rect, width, role == 'user').items():
+            self._icons[name].paint(painter, button_rect.adjusted(2, 2, -2, -2))
+
+        # --- Content ---
+        doc = self._content_document(index, width - 2 * MARGIN)
+        painter.translate(self._content_origin(rect))
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette.setColor(QPalette.ColorRole.Text, option.palette.color(QPalette.ColorRole.Text))
+        context.clip = QRectF(0, 0, doc.textWidth(), doc.size().height())
+        doc.documentLayout().draw(painter, context)
+        painter.restore()
+
+    def _content_height(self, index: QModelIndex, width: int) -> int:
+        doc = self._content_document(index, width - 2 * MARGIN)
+        return MARGIN * 2 + HEADER_HEIGHT + SPACING + int(doc.size().height())
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        width = self._available_width(option)
+        message_id = index.data(ChatListModel.MessageIdRole)
+        editor = self._editors.get(message_id)
+        if editor:
+            return QSize(width, editor.sizeHint().height())
+        height = self._content_height(index, width)
+        if message_id:
+            self._row_heights[message_id] = height
+        return QSize(width, height)
+
+    def height_changed(self, index: QModelIndex) -> bool:
+        """True if the row's content no longer has the height its last sizeHint reported.
+
+        QListView does not re-query sizeHint on dataChanged, so callers emit sizeHintChanged
+        when this returns True.
+        """
+        message_id = index.data(ChatListModel.MessageIdRole)
+        if not message_id or message_id in self._editors:
+            return False
+        height = self._content_height(index, self._available_width(QStyleOptionViewItem()))
+        return self._row_heights.get(message_id) != height
+
+    # --- Interaction ---
+    def editorEvent(self, event: QEvent, model, option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        if event.type() != QEvent.Type.MouseButtonRelease or event.button() != Qt.MouseButton.LeftButton:
+            return super().editorEvent(event, model, option, index)
+        pos = event.position().toPoint()
+        message_id = index.data(ChatListModel.MessageIdRole)
+        role = index.data(ChatListModel.RoleRole)
+        width = self._available_width(option)
+
+        for name, button_rect in self._button_rects(option.rect, width, role == 'user').items():
+            if button_rect.contains(pos):
+                if name == 'copy':
+                    QGuiApplication.clipboard().setText(index.data(ChatListModel.ContentRole) or '')
+                    logger.debug("Copied content of message {} to clipboard.", message_id)
+                    self.copyRequested.emit(message_id)
+                elif name == 'edit':
+                    self.editRequested.emit(message_id)
+                else:
+                    self.deleteRequested.emit(message_id)
+                return True
+
+        # Links in rendered content open externally, like the QTextBrowser did
+        doc = self._content_document(index, width - 2 * MARGIN)
+        anchor = doc.documentLayout().anchorAt(pos - self._content_origin(option.rect))
+        if anchor:
+            QDesktopServices.openUrl(QUrl(anchor))
+            return True
+        return super().editorEvent(event, model, option, index)
+
+    # --- Edit Mode (persistent editor) ---
+    def createEditor(self, parent, option: QStyleOptionViewItem, index: QModelIndex):
+        message_data = {
+            'id': index.data(ChatListModel.MessageIdRole),
+            'role': index.data(ChatListModel.RoleRole),
+            'content': index.data(ChatListModel.ContentRole) or '',
+            'timestamp': index.data(ChatListModel.TimestampRole),
+        }
+        editor = ChatMessageWidget(message_data, parent)
+        editor.setAutoFillBackground(True)
+        editor.editSubmitted.connect(self.editSubmitted)
+        editor.editCancelled.connect(self.editCancelled)
+        self._editors[editor.message_id] = editor
+        editor.enter_edit_mode()
+        return editor
+
+    def destroyEditor(self, editor, index: QModelIndex):
+        if isinstance(editor, ChatMessageWidget):
+            self._editors.pop(editor.message_id, None)
+        super().destroyEditor(editor, index)
+
+    def updateEditorGeometry(self, editor, option: QStyleOptionViewItem, index: QModelIndex):
+        editor.setGeometry(option.rect)
+
+    def setEditorData(self, editor, index: QModelIndex):
+        pass # Editor is seeded in createEditor; view refreshes must not reset the draft
+
+    def setModelData(self, editor, model, index: QModelIndex):
+        pass # Submissions go through editSubmitted -> ChatManager, not the model
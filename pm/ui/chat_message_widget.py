@@ -2,20 +2,36 @@
 import datetime
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTextEdit,
-    QSizePolicy, QTextBrowser, QSpacerItem, QApplication, QListWidget # Added QListWidget
+    QSizePolicy, QTextBrowser, QSpacerItem, QApplication, QListView
 )
-from PySide6.QtCore import Qt, Signal, QSize
+from PySide6.QtCore import Qt, Signal, Slot, QSize
 from PySide6.QtGui import QFont, QTextBlock, QFontMetrics, QGuiApplication
 import qtawesome as qta
 from markdown2 import markdown
 from loguru import logger
 import uuid
 
+# Shared with ChatMessageDelegate so both render identical HTML
+CONTENT_STYLESHEET = (
+    "pre, code { font-family: Consolas, Monaco, 'Andale Mono', 'Ubuntu Mono', monospace; "
+    "background-color: rgba(0, 0, 0, 0.15); border: 1px solid rgba(255, 255, 255, 0.1); "
+    "padding: 5px; border-radius: 4px; font-size: 10pt; }"
+    "pre { display: block; white-space: pre-wrap; word-wrap: break-word; }"
+)
+
+def markdown_to_html(raw_content: str) -> str:
+    """Converts message markdown to the HTML used for chat display."""
+    # Ensure code blocks wrap and newlines work reasonably
+    html_content = markdown(raw_content, extras=["fenced-code-blocks", "code-friendly", "break-on-newline"])
+    # Try to fix extra space from empty <p><br />\n</p> tags
+    return html_content.replace("<p><br />\n</p>", "<br />")
+
 class ChatMessageWidget(QWidget):
     """Custom widget to display a single chat message with interaction buttons."""
     deleteRequested = Signal(str)
     editRequested = Signal(str)
     editSubmitted = Signal(str, str)
+    editCancelled = Signal(str)
     copyRequested = Signal(str)
 
     def __init__(self, message_data: dict, parent=None):
@@ -90,10 +106,7 @@ class ChatMessageWidget(QWidget):
         # Removed fixed height here
         self.content_display.setStyleSheet(
             "QTextBrowser { border: none; background-color: transparent; padding: 0px; }"
-            "pre, code { font-family: Consolas, Monaco, 'Andale Mono', 'Ubuntu Mono', monospace; "
-            "background-color: rgba(0, 0, 0, 0.15); border: 1px solid rgba(255, 255, 255, 0.1); "
-            "padding: 5px; border-radius: 4px; font-size: 10pt; }"
-            "pre { display: block; white-space: pre-wrap; word-wrap: break-word; }"
+            + CONTENT_STYLESHEET
         )
         # Let the widget expand horizontally, but its height should be determined by content
         self.content_display.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
@@ -116,7 +129,7 @@ class ChatMessageWidget(QWidget):
         self.save_button.clicked.connect(self._handle_save)
         edit_button_layout.addWidget(self.save_button)
         self.cancel_button = QPushButton("Cancel")
-        self.cancel_button.clicked.connect(self.exit_edit_mode)
+        self.cancel_button.clicked.connect(self._handle_cancel)
         edit_button_layout.addWidget(self.cancel_button)
         edit_layout.addLayout(edit_button_layout)
 
@@ -131,11 +144,7 @@ class ChatMessageWidget(QWidget):
         """Updates the text browser content and triggers layout recalculation."""
         self._raw_content = new_raw_content
         try:
-            # Ensure code blocks wrap and newlines work reasonably
-            html_content = markdown(new_raw_content, extras=["fenced-code-blocks", "code-friendly", "break-on-newline"])
-            # Try to fix extra space from empty <p><br />\n</p> tags
-            html_content = html_content.replace("<p><br />\n</p>", "<br />")
-            self.content_display.setHtml(html_content)
+            self.content_display.setHtml(markdown_to_html(new_raw_content))
         except Exception as e:
             logger.error(f"Markdown formatting error: {e}")
             self.content_display.setPlainText(f"[Error formatting content]\n{new_raw_content}")
@@ -199,19 +208,19 @@ class ChatMessageWidget(QWidget):
         if current_width > 50:
             return current_width - 10 # Subtract a bit for padding/margins
 
-        # Fallback: Traverse up to find the QListWidget viewport width
+        # Fallback: Traverse up to find the chat list view's viewport width
         parent_widget = self.parent()
-        while parent_widget and not isinstance(parent_widget, QListWidget):
+        while parent_widget and not isinstance(parent_widget, QListView):
             parent_widget = parent_widget.parent()
 
-        if isinstance(parent_widget, QListWidget) and parent_widget.viewport():
+        if isinstance(parent_widget, QListView) and parent_widget.viewport():
             viewport_width = parent_widget.viewport().width()
             # Subtract scrollbar width (approx) and some padding
             scrollbar_width = parent_widget.verticalScrollBar().width() if parent_widget.verticalScrollBar().isVisible() else 0
             effective_width = viewport_width - scrollbar_width - 25 # More generous buffer
             return max(100, effective_width) # Ensure a minimum reasonable width
 
-        # Absolute fallback if no list widget found
+        # Absolute fallback if no list view found
         return 600
 
     def enter_edit_mode(self):
@@ -244,12 +253,15 @@ class ChatMessageWidget(QWidget):
         logger.debug(f"Exiting edit mode for message ID: {self.message_id}")
         self.updateGeometry() # Recalculate size hint based on content display
 
+    @Slot()
     def _request_delete(self):
         self.deleteRequested.emit(self.message_id)
 
+    @Slot()
     def _request_edit(self):
         self.editRequested.emit(self.message_id)
 
+    @Slot()
     def _handle_save(self):
         new_content = self.edit_area.toPlainText().strip() # Strip whitespace
         # Check if content actually changed
@@ -259,8 +271,14 @@ class ChatMessageWidget(QWidget):
             # self.exit_edit_mode() # Don't exit here immediately
         else:
             logger.debug("Edit submitted, but content unchanged. Cancelling edit.")
-            self.exit_edit_mode() # Exit if no change
+            self._handle_cancel() # Exit if no change
+
+    @Slot()
+    def _handle_cancel(self):
+        self.exit_edit_mode()
+        self.editCancelled.emit(self.message_id)
 
+    @Slot()
     def _request_copy(self):
         clipboard = QGuiApplication.clipboard()
         clipboard.setText(self._raw_content)
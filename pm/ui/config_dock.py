@@ -432,7 +432,7 @@ class ConfigDock(QDockWidget):
                 logger.error("ConfigDock: Cannot recreate RAG checkboxes, container missing.")
 
             # Prompt Lists
-            all_prompts = settings.get('prompts', [])
+            all_prompts = settings.get('user_prompts', [])
             selected_ids = settings.get('selected_prompt_ids', [])
             self.populate_available_prompts(all_prompts)
             self.populate_selected_prompts(selected_ids, all_prompts)
@@ -496,10 +496,14 @@ class ConfigDock(QDockWidget):
 
 
     def populate_selected_prompts(self, selected_ids: List[str], all_prompts_data: List[Dict]):
+        prompts_by_id = {p['id']: p for p in all_prompts_data if 'id' in p}
+        self.populate_selected_prompts_indexed(selected_ids, prompts_by_id)
+
+    def populate_selected_prompts_indexed(self, selected_ids: List[str], prompts_by_id: Dict[str, Dict]):
+        """Like populate_selected_prompts, for callers that already hold an id -> prompt map."""
         self.selected_prompts_list.blockSignals(True)
         self.selected_prompts_list.clear()
         logger.debug(f"ConfigDock: Populating selected prompts list with IDs: {selected_ids}")
-        prompts_by_id = {p['id']: p for p in all_prompts_data if 'id' in p}
         for prompt_id in selected_ids:
             prompt_data = prompts_by_id.get(prompt_id)
             if prompt_data:
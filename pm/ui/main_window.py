@@ -21,7 +21,7 @@ import traceback # Ensure traceback is imported
 # --- Core Components ---
 from ..core.app_core import AppCore
 from ..core.logging_setup import LOG_PATH
-from ..core.constants import TOKEN_COUNT_ROLE
+from ..core.constants import TOKEN_COUNT_ROLE, IS_DIR_ROLE
 
 # --- UI Components ---
 from .main_window_ui import MainWindowUI
@@ -51,6 +51,11 @@ class MainWindow(QMainWindow):
         self._enforce_limit_timer.setSingleShot(True)
         self._enforce_limit_timer.setInterval(150)
         self._enforce_limit_timer.timeout.connect(self._check_and_enforce_token_limit)
+        # Token status refresh after tree check changes: runs once per event-loop turn, after propagation
+        self._token_display_timer = QTimer(self)
+        self._token_display_timer.setSingleShot(True)
+        self._token_display_timer.setInterval(0)
+        self._token_display_timer.timeout.connect(self._update_status_token_display)
         self._initial_refresh_done = False
 
         # --- Initialize Core ---
@@ -120,6 +125,8 @@ class MainWindow(QMainWindow):
         self.core.llm.context_limit_changed.connect(self.ui.config_dock_widget.update_context_limit_display)
         self.core.llm.context_limit_changed.connect(self._check_and_enforce_token_limit)
         self.core.workspace.project_changed.connect(self.core.settings.load_project)
+        # Background tree scans finish after project_changed; refresh token totals once filled
+        self.core.workspace.file_tree_populated.connect(self._token_display_timer.start)
         # Lambdas for simple setting updates are acceptable per the rules
         self.ui.config_dock_widget.provider_changed.connect(lambda p: self.core.settings.set_setting('provider', p))
         self.ui.config_dock_widget.model_changed.connect(lambda m: self.core.settings.set_setting('model', m))
@@ -127,7 +134,7 @@ class MainWindow(QMainWindow):
         self.ui.config_dock_widget.rag_toggle_changed.connect(lambda key, state: self.core.settings.set_setting(key, state))
         self.ui.config_dock_widget.request_model_list_refresh.connect(self._refresh_config_dock_models)
         self.ui.file_tree.itemChanged.connect(self._handle_tree_item_changed_for_status)
-        self.ui.file_tree.itemChanged.connect(self.workspace_handler.handle_tree_item_changed)
+        # workspace_handler connects itemChanged -> handle_tree_item_changed itself (UniqueConnection)
         self.ui.file_tree.customContextMenuRequested.connect(self._show_tree_context_menu)
         self.ui.tree_select_all_btn.clicked.connect(self._select_all_tree_items)
         self.ui.tree_deselect_all_btn.clicked.connect(self._deselect_all_tree_items)
@@ -175,6 +182,7 @@ class MainWindow(QMainWindow):
             hex_list = [byte_array.toHex().data().decode()]
             self.core.settings.set_setting("main_splitter_state", hex_list)
 
+    @Slot()
     def _apply_initial_settings(self):
         logger.debug("MainWindow: Applying initial theme/font/style via handler...")
         self.settings_handler.apply_initial_settings()
@@ -208,7 +216,7 @@ class MainWindow(QMainWindow):
 
     @Slot(str, object)
     def _handle_setting_change_for_dock(self, key: str, value: object):
-        relevant_keys = ['provider', 'model', 'temperature', 'top_k', 'prompts', 'selected_prompt_ids']
+        relevant_keys = ['provider', 'model', 'temperature', 'top_k', 'selected_prompt_ids'] # user_prompts: PromptActionHandler via prompts_changed
         is_relevant = key in relevant_keys or key.startswith('rag_')
         if is_relevant:
             logger.info(f"Setting '{key}' changed, repopulating ConfigDock and triggering refresh.")
@@ -353,7 +361,7 @@ class MainWindow(QMainWindow):
     def _handle_tree_item_changed_for_status(self, item: QTreeWidgetItem, column: int):
         if column == 0:
             logger.trace(f"Item changed: {item.text(0)}, state: {item.checkState(0)}")
-            self._update_status_token_display()
+            self._token_display_timer.start() # Coalesced; child propagation has not run yet here
             self._enforce_limit_timer.start()
 
     def _get_checked_tokens(self) -> int:
@@ -373,9 +381,8 @@ class MainWindow(QMainWindow):
                 path_str = item.data(0, Qt.ItemDataRole.UserRole)
                 if path_str:
                     try:
-                        # Only process files for token count
-                        path = Path(path_str)
-                        if path.is_file():
+                        # Only process files for token count (type cached at population: no stat per item)
+                        if not item.data(0, IS_DIR_ROLE):
                             token_count_data = item.data(0, TOKEN_COUNT_ROLE)
                             if isinstance(token_count_data, int) and token_count_data >= 0:
                                 token_count = token_count_data # Assign valid token count
@@ -399,6 +406,7 @@ class MainWindow(QMainWindow):
             iterator += 1
         return total_tokens
 
+    @Slot()
     def _update_status_token_display(self):
         selected_tokens = self._get_checked_tokens()
         max_tokens = self.core.llm.get_context_limit()
@@ -431,7 +439,7 @@ class MainWindow(QMainWindow):
                 path_str = item.data(0, Qt.ItemDataRole.UserRole)
                 if path_str:
                      try:
-                         if Path(path_str).is_file():
+                         if not item.data(0, IS_DIR_ROLE): # Cached type, no stat per item
                              token_data = item.data(0, TOKEN_COUNT_ROLE)
                              if isinstance(token_data, int) and token_data >= 0:
                                  item_tokens = token_data
@@ -499,14 +507,14 @@ class MainWindow(QMainWindow):
         if not path_str:
             return
 
-        path = Path(path_str)
+        is_dir = bool(item.data(0, IS_DIR_ROLE))
         menu = QMenu(self)
 
-        if path.is_file():
+        if not is_dir:
             open_action = menu.addAction(qta.icon('fa5s.folder-open'), "Open")
             # Lambda connection is okay here
             open_action.triggered.connect(lambda: self.workspace_handler.handle_tree_item_activated(item, 0))
-        elif path.is_dir():
+        else:
             expand_action = menu.addAction("Expand/Collapse")
             expand_action.triggered.connect(lambda: item.setExpanded(not item.isExpanded()))
 
@@ -521,7 +529,7 @@ class MainWindow(QMainWindow):
                 check_action = menu.addAction(qta.icon('fa5s.check-square'), "Check")
                 check_action.triggered.connect(lambda: item.setCheckState(0, Qt.CheckState.Checked))
 
-            if path.is_dir(): # Actions specific to checkable directories
+            if is_dir: # Actions specific to checkable directories
                 menu.addSeparator()
                 check_children_action = menu.addAction("Check All Children")
                 uncheck_children_action = menu.addAction("Uncheck All Children")
@@ -571,6 +579,8 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         logger.info("Close triggered.")
+        # Settle background saves first so the unsaved-changes check sees their results
+        self.core.workspace.wait_for_pending_saves()
         if not self.workspace_handler.close_all_tabs(confirm=True):
             logger.debug("Close ignored by user (cancelled tab closing).")
             event.ignore()
@@ -586,6 +596,10 @@ class MainWindow(QMainWindow):
              self._continue_close(event) # No tasks running, continue close immediately
 
     def _continue_close(self, event):
+        logger.debug("Stopping background checks before closing...")
+        self.chat_handler.stop_change_detection()
+        self.settings_handler.stop_stylesheet_workers()
+        self.core.workspace.stop_tree_scans()
         logger.debug("Saving window state & settings before closing...")
         self._save_window_state()
         if not self.core.settings.save_settings():
@@ -1,7 +1,7 @@
 # pm/ui/main_window_ui.py
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QSplitter, QPlainTextEdit, QTreeWidget, QDockWidget,
-                             QListWidget, QPushButton, QTabWidget, QLabel,
+                             QListView, QPushButton, QTabWidget, QLabel,
                              QHeaderView, QSizePolicy)
 from PySide6.QtCore import Qt
 from loguru import logger
@@ -22,7 +22,7 @@ class MainWindowUI:
         # Widgets that need to be accessed externally
         self.file_tree_widget: QTreeWidget = None
         self.editor_tab_widget: QTabWidget = None
-        self.chat_list_widget: QListWidget = None
+        self.chat_list_widget: QListView = None
         self.chat_input_edit: QPlainTextEdit = None
         self.send_button: QPushButton = None
         self.config_dock: ConfigDock = None
@@ -74,11 +74,16 @@ class MainWindowUI:
         chat_layout = QVBoxLayout(self.chat_area_widget)
         chat_layout.setContentsMargins(5,5,5,5)
         chat_layout.setSpacing(5)
-        self.chat_list_widget = QListWidget()
+        # Model/delegate are attached by ChatActionHandler
+        self.chat_list_widget = QListView()
         self.chat_list_widget.setObjectName("chat_list_widget")
         self.chat_list_widget.setAlternatingRowColors(True)
         self.chat_list_widget.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.chat_list_widget.setVerticalScrollMode(QListWidget.ScrollMode.ScrollPerPixel)
+        self.chat_list_widget.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.chat_list_widget.setUniformItemSizes(False) # Message heights vary; the delegate sizes each row
+        self.chat_list_widget.setResizeMode(QListView.ResizeMode.Adjust) # Re-wrap messages when width changes
+        self.chat_list_widget.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.chat_list_widget.setEditTriggers(QListView.EditTrigger.NoEditTriggers) # Edit mode is opened explicitly
         chat_layout.addWidget(self.chat_list_widget, 1)
 
         chat_input_layout = QHBoxLayout()
@@ -137,7 +142,7 @@ class MainWindowUI:
     @property
     def tab_widget(self) -> QTabWidget: return self.editor_tab_widget
     @property
-    def chat_list(self) -> QListWidget: return self.chat_list_widget
+    def chat_list(self) -> QListView: return self.chat_list_widget
     @property
     def chat_input(self) -> QPlainTextEdit: return self.chat_input_edit
     @property
@@ -33,13 +33,16 @@ class SettingsDialog(QDialog):
 
     def __init__(self,
                  settings_service: SettingsService,
-                 parent=None):
+                 parent=None,
+                 initial_values: Optional[Dict[str, Any]] = None):
         super().__init__(parent)
         self.setWindowTitle('Global Application Settings')
         # Adjusted size to accommodate RAG defaults
         self.setMinimumSize(650, 500)
 
         self._settings_service = settings_service
+        # Snapshot taken by the caller; widgets are populated from it, not per-key service calls
+        self._initial_values: Dict[str, Any] = initial_values if initial_values is not None else settings_service.get_all_settings()
 
         # --- Main Layout ---
         main_layout = QVBoxLayout(self)
@@ -68,12 +71,21 @@ class SettingsDialog(QDialog):
 
         # --- Populate Fields & Initial Refresh ---
         self._populate_all_fields()
-        # Request initial refreshes for potential validation (connection is external)
-        QTimer.singleShot(50, self._emit_llm_refresh_request)
-        QTimer.singleShot(50, self._emit_summarizer_refresh_request)
+        self._schedule_refresh_requests()
 
         logger.debug("SettingsDialog initialized (Global RAG controls restored).")
 
+    def reset_from_settings(self, initial_values: Optional[Dict[str, Any]] = None):
+        """Re-populates a reused dialog from a fresh settings snapshot before it is shown again."""
+        self._initial_values = initial_values if initial_values is not None else self._settings_service.get_all_settings()
+        self._populate_all_fields()
+        self._schedule_refresh_requests()
+
+    def _schedule_refresh_requests(self):
+        # Request refreshes for potential validation (connection is external)
+        QTimer.singleShot(50, self._emit_llm_refresh_request)
+        QTimer.singleShot(50, self._emit_summarizer_refresh_request)
+
     def _create_widgets(self):
         """Creates the input widgets relevant to this dialog."""
         logger.debug("SettingsDialog: Creating widgets...")
@@ -182,39 +194,38 @@ class SettingsDialog(QDialog):
 
     # --- Data Population & UI State ---
     def _populate_all_fields(self):
-        """Populates all widgets with values from SettingsService."""
-        logger.debug("SettingsDialog: Populating relevant fields from SettingsService...")
-        s = self._settings_service
+        """Populates all widgets from the settings snapshot (falls back to SettingsService per key)."""
+        logger.debug("SettingsDialog: Populating relevant fields from settings snapshot...")
 
         # API Keys
-        self.llm_api_key_input.setText(s.get_setting('api_key', ''))
-        self.bing_api_key_input.setText(s.get_setting('rag_bing_api_key', ''))
-        self.google_api_key_input.setText(s.get_setting('rag_google_api_key', ''))
-        self.google_cse_id_input.setText(s.get_setting('rag_google_cse_id', ''))
+        self.llm_api_key_input.setText(self._initial_value('api_key', ''))
+        self.bing_api_key_input.setText(self._initial_value('rag_bing_api_key', ''))
+        self.google_api_key_input.setText(self._initial_value('rag_google_api_key', ''))
+        self.google_cse_id_input.setText(self._initial_value('rag_google_cse_id', ''))
 
         # RAG Defaults
-        self.rag_rank_model_select.setCurrentText(s.get_setting('rag_ranking_model_name', AVAILABLE_RAG_MODELS[0]))
-        self.rag_rank_threshold_spin.setValue(float(s.get_setting('rag_similarity_threshold', 0.30)))
+        self.rag_rank_model_select.setCurrentText(self._initial_value('rag_ranking_model_name', AVAILABLE_RAG_MODELS[0]))
+        self.rag_rank_threshold_spin.setValue(float(self._initial_value('rag_similarity_threshold', 0.30)))
 
         # Features
-        self.feature_patch_cb.setChecked(s.get_setting('patch_mode', True))
-        self.feature_whole_diff_cb.setChecked(s.get_setting('whole_file', True))
+        self.feature_patch_cb.setChecked(self._initial_value('patch_mode', True))
+        self.feature_whole_diff_cb.setChecked(self._initial_value('whole_file', True))
         self.feature_whole_diff_cb.setEnabled(self.feature_patch_cb.isChecked())
-        self.feature_disable_critic_cb.setChecked(s.get_setting('disable_critic_workflow', False)) # <<< POPULATE NEW
+        self.feature_disable_critic_cb.setChecked(self._initial_value('disable_critic_workflow', False)) # <<< POPULATE NEW
 
         # Appearance
-        try: self.appearance_font_combo.setCurrentFont(QFont(s.get_setting('editor_font', 'Fira Code')))
+        try: self.appearance_font_combo.setCurrentFont(QFont(self._initial_value('editor_font', 'Fira Code')))
         except Exception as e: logger.warning(f"Failed to set font: {e}"); self.appearance_font_combo.setCurrentFont(QFont("Monospace"))
-        self.appearance_font_size_spin.setValue(int(s.get_setting('editor_font_size', 11)))
-        self.appearance_theme_combo.setCurrentText(s.get_setting('theme', 'Dark'))
-        current_style = s.get_setting('syntax_highlighting_style', DEFAULT_STYLE)
+        self.appearance_font_size_spin.setValue(int(self._initial_value('editor_font_size', 11)))
+        self.appearance_theme_combo.setCurrentText(self._initial_value('theme', 'Dark'))
+        current_style = self._initial_value('syntax_highlighting_style', DEFAULT_STYLE)
         if self.appearance_style_combo.isEnabled():
             style_index = self.appearance_style_combo.findText(current_style)
             if style_index >= 0: self.appearance_style_combo.setCurrentIndex(style_index)
             else: logger.warning(f"Populate: Style '{current_style}' not in combo, using default."); self.appearance_style_combo.setCurrentText(DEFAULT_STYLE)
 
         # Prompts Tab
-        user_prompts_list = s.get_setting('user_prompts', [])
+        user_prompts_list = self._initial_value('user_prompts', [])
         try:
             self.user_prompts_edit.setPlainText(json.dumps(user_prompts_list, indent=2))
         except Exception as e:
@@ -223,6 +234,12 @@ class SettingsDialog(QDialog):
 
         logger.debug("SettingsDialog: Fields populated.")
 
+    def _initial_value(self, key: str, default: Optional[Any] = None) -> Any:
+        """Reads from the snapshot, falling back to SettingsService for keys it lacks."""
+        if key in self._initial_values:
+            return self._initial_values[key]
+        return self._settings_service.get_setting(key, default)
+
     # --- Model Refresh Slots (remain, used externally if needed) ---
     @Slot(list)
     def _populate_llm_model_select(self, models: list):
@@ -279,6 +296,9 @@ class SettingsDialog(QDialog):
              return # Stop saving
         # --- End User Prompt Validation ---
 
+        saved = False
+        error_message = None
+        s.begin_batch() # Each changed setting group signals once, when the batch ends below
         try:
             # Define ONLY the settings managed by this dialog
             dialog_settings_map = {
@@ -322,14 +342,19 @@ class SettingsDialog(QDialog):
                 s.set_setting('user_prompts', parsed_user_prompts)
             # ---------------------------------
 
-            if s.save_settings():
-                self.accept()
-            else:
-                QMessageBox.critical(self, "Error Saving Settings", "Failed to save settings. Please check logs.")
-
+            saved = s.save_settings()
         except Exception as e:
              logger.exception("Error gathering settings from dialog widgets:")
-             QMessageBox.critical(self, "Error Saving Settings", f"An unexpected error occurred gathering settings:\n{e}")
+             error_message = f"An unexpected error occurred gathering settings:\n{e}"
+        finally:
+            s.end_batch(emit_diff=True) # Ended before any modal box so other settings changes are not deferred
+
+        if error_message:
+            QMessageBox.critical(self, "Error Saving Settings", error_message)
+        elif saved:
+            self.accept()
+        else:
+            QMessageBox.critical(self, "Error Saving Settings", "Failed to save settings. Please check logs.")
 
     def closeEvent(self, event):
         logger.debug("SettingsDialog closeEvent.")
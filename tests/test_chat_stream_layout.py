@@ -0,0 +1,51 @@
+# tests/test_chat_stream_layout.py
+import os
+import types
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtCore = pytest.importorskip("PySide6.QtCore")
+QtWidgets = pytest.importorskip("PySide6.QtWidgets")
+chat_action_handler = pytest.importorskip("pm.handlers.chat_action_handler")
+
+from pm.ui.chat_list_model import ChatListModel
+from pm.ui.chat_message_delegate import ChatMessageDelegate
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def test_streamed_row_grows_with_content(app):
+    view = QtWidgets.QListView()
+    view.setResizeMode(QtWidgets.QListView.ResizeMode.Adjust)
+    view.resize(400, 600)
+    model = ChatListModel(view)
+    delegate = ChatMessageDelegate(view)
+    view.setModel(model)
+    view.setItemDelegate(delegate)
+    view.show()
+
+    model.append_message({'id': 'ai-1', 'role': 'ai', 'content': ''})
+    delegate.set_streaming_message('ai-1')
+    app.processEvents()
+    index = model.index_for_id('ai-1')
+    start_height = view.visualRect(index).height()
+
+    # Only the attributes _update_message_content touches
+    handler = types.SimpleNamespace(
+        _chat_model=model,
+        _chat_delegate=delegate,
+        _visible_message_id=None,
+        _ensure_visible_timer=QtCore.QTimer(),
+    )
+    content = ""
+    for _ in range(10):
+        content += "A streamed line of reply text.\n\n"
+        chat_action_handler.ChatActionHandler._update_message_content(handler, 'ai-1', content)
+    app.processEvents()
+
+    assert view.visualRect(index).height() > start_height
+    view.close()